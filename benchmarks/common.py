@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import subprocess
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+LOWER_IS_BETTER = ("mean_ms", "p50_ms", "p99_ms", "rss_mb", "seconds")
+HIGHER_IS_BETTER = ("throughput", "tokens_per_sec")
+
+
+def enter_backend(project: str, args: argparse.Namespace, offline: Optional[bool] = None) -> Path:
+    """Make `<project>/backend` importable and the working directory, as the services expect."""
+    # Resolve user paths before leaving the caller's working directory
+    for name in ("output", "baseline"):
+        if getattr(args, name, None):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    if offline is None:
+        offline = not (args.url or getattr(args, "launch", False))
+    if offline:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    backend_dir = REPO_ROOT / project / "backend"
+    os.chdir(backend_dir)
+    sys.path.insert(0, str(backend_dir))
+    return backend_dir
+
+
+def launch_server(backend_dir: Path, port: int, timeout: float = 600.0) -> Tuple[subprocess.Popen, float]:
+    """Start `uvicorn app:app` for a backend and return the process and the seconds until it answered /metrics."""
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port)], cwd=backend_dir
+    )
+
+    # uvicorn only accepts connections once the lifespan hook (model loading) has finished
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode} before becoming ready")
+        try:
+            with urllib.request.urlopen(f"{url}/metrics", timeout=1):
+                return process, time.perf_counter() - start
+        except OSError:
+            time.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError(f"uvicorn was not ready after {timeout:.0f}s")
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def summarize(latencies: Sequence[float], wall_seconds: float, items_per_call: int = 1) -> Dict[str, float]:
+    values = sorted(latencies)
+    n = len(values)
+    if n == 0:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "throughput": 0.0}
+
+    def percentile(q: float) -> float:
+        return values[min(n - 1, int(round(q * (n - 1))))] * 1000
+
+    return {
+        "count": n,
+        "mean_ms": round(sum(values) / n * 1000, 3),
+        "p50_ms": round(percentile(0.5), 3),
+        "p99_ms": round(percentile(0.99), 3),
+        "throughput": round(n * items_per_call / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+    }
+
+
+def time_calls(
+    fn: Callable[[], object],
+    iterations: int = 20,
+    warmup: int = 2,
+    items_per_call: int = 1
+) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+
+    latencies: List[float] = []
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - wall_start
+
+    return summarize(latencies, wall, items_per_call)
+
+
+async def drive_http(
+    send: Callable[[int], Awaitable[object]],
+    total_requests: int,
+    concurrency: int,
+    items_per_request: int = 1
+) -> Dict[str, float]:
+    """Issue `total_requests` calls of `send(i)` from `concurrency` workers and summarise latencies."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = iter(range(total_requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in next_index:
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    stats = summarize(latencies, wall, items_per_request)
+    stats["errors"] = errors
+    return stats
+
+
+def build_metadata(extra: Optional[Dict] = None) -> Dict:
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+        meta["torch"] = torch.__version__
+        meta["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    try:
+        import transformers
+        meta["transformers"] = transformers.__version__
+    except ImportError:
+        pass
+    if extra:
+        meta.update(extra)
+    return meta
+
+
+def record_key(record: Dict) -> str:
+    key = f"{record['section']}:{record['name']}"
+    if "concurrency" in record:
+        key += f"@c{record['concurrency']}"
+    return key
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """Return a message for every metric that is worse than the baseline by more than `threshold`.
+
+    Failed requests are left out of the latencies, so any increase in `errors` counts as a regression.
+    """
+    baseline_records = {record_key(r): r for r in baseline.get("records", [])}
+    regressions = []
+
+    for record in current.get("records", []):
+        key = record_key(record)
+        base = baseline_records.get(key)
+        if base is None:
+            continue
+
+        old_errors, new_errors = base.get("errors", 0), record.get("errors", 0)
+        if new_errors > old_errors:
+            regressions.append(f"{key} errors: {old_errors} -> {new_errors}")
+
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = base.get(metric), record.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            if worse:
+                regressions.append(f"{key} {metric}: {old} -> {new} ({change:+.1%})")
+
+    return regressions
+
+
+def print_records(records: List[Dict]) -> None:
+    for record in records:
+        fields = ", ".join(
+            f"{k}={v}" for k, v in record.items() if k not in ("section", "name", "concurrency")
+        )
+        print(f"  {record_key(record):<40} {fields}")
+
+
+def finish(results: Dict, output_path: Optional[str], baseline_path: Optional[str], threshold: float) -> int:
+    """Print and save results, then compare them against a baseline file if one is given."""
+    print("\n📊 Benchmark results:")
+    print_records(results["records"])
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✅ Results saved to {output_path}")
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {threshold:.0%} vs {baseline_path}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✅ No regressions above {threshold:.0%} vs {baseline_path}")
+
+    return 0
+
+
+def add_common_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--url", type=str, default=None, help="Benchmark a running server (e.g. http://localhost:8000) instead of the in-process app")
+    parser.add_argument("--launch", action="store_true", help="Start the backend with uvicorn (real models), time it until ready, then benchmark it over HTTP")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --launch")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrency levels for the HTTP benchmarks")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed iterations per micro-benchmark")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed warm-up iterations per micro-benchmark")
+    parser.add_argument("--threads", type=int, default=1, help="torch intra-op threads, pinned for reproducibility")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fixtures and tiny model weights")
+    parser.add_argument("--skip_http", action="store_true", help="Only run the micro-benchmarks")
+    parser.add_argument("--skip_micro", action="store_true", help="Only run the HTTP benchmarks")
+    parser.add_argument("--output", type=str, default=None, help="Path to save results (JSON)")
+    parser.add_argument("--baseline", type=str, default=None, help="Previous results (JSON) to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
@@ -0,0 +1,29 @@
+import json
+import argparse
+
+from benchmarks.common import compare_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files and flag regressions.")
+    parser.add_argument("baseline", type=str, help="Baseline results (JSON)")
+    parser.add_argument("current", type=str, help="Current results (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    regressions = compare_results(baseline, current, args.threshold)
+    for line in regressions:
+        print(f"❌ {line}")
+    if not regressions:
+        print(f"✅ No regressions above {args.threshold:.0%}")
+
+    raise SystemExit(1 if regressions else 0)
@@ -0,0 +1,183 @@
+import os
+import time
+import difflib
+import argparse
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import build_metadata, current_rss_mb, enter_backend, finish
+from benchmarks.fixtures import load_vietnamese_sentences, tiny_correction_pipeline, vietnamese_texts
+
+
+def run_backend(
+    name: str,
+    correct: Callable[[List[str]], List[str]],
+    texts: List[str],
+    tokenizer,
+    iterations: int,
+    warmup: int
+) -> Dict:
+    for _ in range(warmup):
+        correct(texts[:2])
+    if hasattr(correct, "budget_retries"):
+        correct.budget_retries = 0
+
+    outputs: List[str] = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        outputs = correct(texts)
+    elapsed = time.perf_counter() - start
+
+    generated_tokens = sum(len(tokenizer(output, add_special_tokens=False)["input_ids"]) for output in outputs)
+    record = {
+        "section": "correction",
+        "name": name,
+        "seconds": round(elapsed / iterations, 4),
+        "throughput": round(len(texts) * iterations / elapsed, 3),
+        "tokens_per_sec": round(generated_tokens * iterations / elapsed, 2),
+        "rss_mb": round(current_rss_mb(), 1),
+        "outputs": outputs,
+    }
+    if hasattr(correct, "budget_retries"):
+        # Texts per pass whose output hit the length budget and had to be regenerated
+        record["budget_retries"] = correct.budget_retries // iterations
+    return record
+
+
+def length_record(tokenizer, texts: List[str], outputs: List[str], slack: int) -> Dict:
+    """Output/input token ratios of the reference outputs; `needed_ratio` avoids every budget retry at `slack`."""
+    input_lengths = [len(ids) for ids in tokenizer(texts)["input_ids"]]
+    # +1 for the EOS the model has to emit within the budget
+    output_lengths = [len(tokenizer(output, add_special_tokens=False)["input_ids"]) + 1 for output in outputs]
+    ratios = sorted(out / n for out, n in zip(output_lengths, input_lengths))
+    needed = max((out - slack) / n for out, n in zip(output_lengths, input_lengths))
+    return {
+        "section": "length",
+        "name": "reference_output_ratio",
+        "p50_ratio": round(ratios[len(ratios) // 2], 3),
+        "p95_ratio": round(ratios[min(len(ratios) - 1, int(0.95 * len(ratios)))], 3),
+        "max_ratio": round(ratios[-1], 3),
+        "needed_ratio": round(max(needed, 0.0), 3),
+    }
+
+
+def parity(name: str, reference: List[str], candidate: List[str]) -> Dict:
+    exact = sum(a == b for a, b in zip(reference, candidate)) / len(reference)
+    similarity = sum(difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, candidate)) / len(reference)
+    return {"section": "parity", "name": name, "exact_match": round(exact, 4), "similarity": round(similarity, 4)}
+
+
+def bypass_record(checker, sentences: List[str], outputs: List[str]) -> Dict:
+    """How often the already-correct check would skip a sentence that the corrector actually changes."""
+    from src.correction_cache import normalize_segment
+
+    decisions = [checker(normalize_segment(sentence)) for sentence in sentences]
+    unchanged = [normalize_segment(output) == normalize_segment(sentence) for sentence, output in zip(sentences, outputs)]
+    bypassed = sum(decisions)
+    false_bypass = sum(d and not u for d, u in zip(decisions, unchanged))
+    return {
+        "section": "bypass",
+        "name": "lexicon_checker",
+        "sentences": len(sentences),
+        "bypassed": bypassed,
+        "false_bypass": false_bypass,
+        "false_bypass_rate": round(false_bypass / bypassed, 4) if bypassed else 0.0,
+        "unchanged_not_bypassed": sum(u and not d for d, u in zip(decisions, unchanged)),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Parity and tokens/sec of the CorrectionEngine vs. the transformers pipeline, the output/input length ratios behind the engine's budget, and the false-bypass rate of the already-correct check, on the text fixture."
+    )
+    parser.add_argument("--model_name", type=str, default=None, help="Corrector to load (e.g. bmd1905/vietnamese-correction); default: tiny local MBart")
+    parser.add_argument("--iterations", type=int, default=3, help="Timed passes over the fixture per backend")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed warm-up passes per backend")
+    parser.add_argument("--threads", type=int, default=1, help="torch intra-op threads, pinned for reproducibility")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fixtures and tiny model weights")
+    parser.add_argument("--min_similarity", type=float, default=None, help="Fail if int8 engine similarity to the pipeline drops below this")
+    parser.add_argument("--lexicon", type=str, default=None, help="vietTTS lexicon for the already-correct check (default: the backend's assets/lexicon.txt)")
+    parser.add_argument("--max_false_bypass_rate", type=float, default=None, help="Fail if more than this share of bypassed fixture sentences are changed by the pipeline")
+    parser.add_argument("--output", type=str, default=None, help="Path to save results (JSON)")
+    parser.add_argument("--baseline", type=str, default=None, help="Previous results (JSON) to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    parser.set_defaults(url=None)
+    return parser.parse_args()
+
+
+def main(args: Optional[argparse.Namespace] = None) -> int:
+    args = args or parse_args()
+    if args.lexicon:
+        args.lexicon = os.path.abspath(args.lexicon)
+    enter_backend("text_to_speech", args, offline=args.model_name is None)
+
+    import torch
+    from transformers import pipeline
+    torch.set_num_threads(args.threads)
+
+    from src.correction import GENERATION_BATCH_SIZE, LENGTH_RATIO, LENGTH_SLACK, MAX_CHARS
+    from src.correction_engine import CorrectionEngine
+    from src.correction_cache import LexiconChecker, load_lexicon_words
+
+    if args.model_name:
+        corrector = pipeline("text2text-generation", model=args.model_name)
+    else:
+        corrector = tiny_correction_pipeline(args.seed)
+    tokenizer = corrector.tokenizer
+
+    # Sentences are what correction() sends after segmentation; joined texts add longer inputs
+    sentences = load_vietnamese_sentences()
+    texts = sentences + vietnamese_texts(8, args.seed)
+
+    def run_pipeline(batch: List[str]) -> List[str]:
+        preds = corrector(batch, max_length=MAX_CHARS, batch_size=min(len(batch), GENERATION_BATCH_SIZE))
+        return [pred["generated_text"] for pred in preds]
+
+    engine_kwargs = {
+        "max_length": MAX_CHARS,
+        "batch_size": GENERATION_BATCH_SIZE,
+        "length_ratio": LENGTH_RATIO,
+        "length_slack": LENGTH_SLACK,
+    }
+    engines = {
+        "engine_fp32": CorrectionEngine(corrector.model, tokenizer, quantize=False, **engine_kwargs),
+        "engine_int8": CorrectionEngine(corrector.model, tokenizer, quantize=True, **engine_kwargs),
+    }
+
+    print(f"⏱️ Correction backends on {len(texts)} fixture texts")
+    runs = [run_backend("pipeline", run_pipeline, texts, tokenizer, args.iterations, args.warmup)]
+    for name, engine in engines.items():
+        runs.append(run_backend(name, engine, texts, tokenizer, args.iterations, args.warmup))
+
+    reference = runs[0]["outputs"]
+    records = [{k: v for k, v in run.items() if k != "outputs"} for run in runs]
+    records.extend(parity(f"{run['name']}_vs_pipeline", reference, run["outputs"]) for run in runs[1:])
+    int8_parity = records[-1]
+    records.append(length_record(tokenizer, texts, reference, LENGTH_SLACK))
+
+    words = load_lexicon_words(args.lexicon or "./assets/lexicon.txt")
+    if not words:
+        print("⚠️ Lexicon not found or empty, the already-correct check bypasses nothing")
+    bypass = bypass_record(LexiconChecker(words), sentences, reference[:len(sentences)])
+    records.append(bypass)
+
+    results = {
+        "meta": build_metadata({
+            "suite": "correction_engine",
+            "model": args.model_name or "tiny-mbart (local config)",
+            "args": vars(args),
+        }),
+        "records": records,
+    }
+    status = finish(results, args.output, args.baseline, args.threshold)
+
+    if args.min_similarity is not None and int8_parity["similarity"] < args.min_similarity:
+        print(f"❌ int8 engine similarity {int8_parity['similarity']} < {args.min_similarity}")
+        return 1
+    if args.max_false_bypass_rate is not None and bypass["false_bypass_rate"] > args.max_false_bypass_rate:
+        print(f"❌ False-bypass rate {bypass['false_bypass_rate']} > {args.max_false_bypass_rate}")
+        return 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
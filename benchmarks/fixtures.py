@@ -0,0 +1,131 @@
+import io
+import os
+import re
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+
+
+def synthetic_jpegs(
+    count: int,
+    seed: int = 0,
+    sizes: Tuple[Tuple[int, int], ...] = ((640, 480), (500, 375), (320, 240))
+) -> List[bytes]:
+    """Deterministic JPEG payloads (smooth gradients plus noise) in typical upload sizes."""
+    rng = np.random.default_rng(seed)
+    payloads = []
+
+    for i in range(count):
+        width, height = sizes[i % len(sizes)]
+        xs = np.linspace(0, 1, width, dtype=np.float32)[None, :, None]
+        ys = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+        tint = rng.random(3, dtype=np.float32)
+        base = (xs * tint + ys * (1 - tint)) * 255
+        noise = rng.normal(0, 20, size=(height, width, 3))
+        pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+
+        buffer = io.BytesIO()
+        Image.fromarray(pixels, mode="RGB").save(buffer, format="JPEG", quality=90)
+        payloads.append(buffer.getvalue())
+
+    return payloads
+
+
+def write_jpegs(output_dir: str, count: int, seed: int = 0) -> List[str]:
+    """Write synthetic JPEGs named like the training data (cat.N.jpg / dog.N.jpg)."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for i, payload in enumerate(synthetic_jpegs(count, seed)):
+        path = os.path.join(output_dir, f"{'cat' if i % 2 == 0 else 'dog'}.{i}.jpg")
+        with open(path, "wb") as f:
+            f.write(payload)
+        paths.append(path)
+    return paths
+
+
+def load_vietnamese_sentences() -> List[str]:
+    with open(ASSETS_DIR / "vi_sentences.txt", "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def vietnamese_texts(count: int, seed: int = 0, max_sentences: int = 4) -> List[str]:
+    """Texts of 1..max_sentences fixture sentences, so short and multi-chunk inputs are both covered."""
+    sentences = load_vietnamese_sentences()
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(sentences, k=rng.randint(1, max_sentences))) for _ in range(count)]
+
+
+def tiny_vit_config():
+    from transformers import ViTConfig
+
+    # Same patching and input size as ViT-Base, so the real processor settings still apply
+    return ViTConfig(
+        image_size=224,
+        patch_size=16,
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128,
+    )
+
+
+def tiny_vit_processor():
+    from transformers import ViTImageProcessor
+
+    # Mirrors the preprocessing config of google/vit-base-patch16-224-in21k
+    return ViTImageProcessor(
+        do_resize=True,
+        size={"height": 224, "width": 224},
+        do_normalize=True,
+        image_mean=[0.5, 0.5, 0.5],
+        image_std=[0.5, 0.5, 0.5],
+    )
+
+
+def tiny_correction_pipeline(seed: int = 0):
+    """A randomly initialised MBart text2text pipeline with a word-level tokenizer built from the fixtures."""
+    import torch
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers
+    from transformers import MBartConfig, MBartForConditionalGeneration, PreTrainedTokenizerFast, pipeline
+
+    special_tokens = ["<pad>", "</s>", "<s>", "<unk>"]
+    # Same split as pre_tokenizers.Whitespace, so every fixture token is in the vocabulary
+    words = sorted({w for line in load_vietnamese_sentences() for w in re.findall(r"\w+|[^\w\s]+", line.lower())})
+    vocab = {token: idx for idx, token in enumerate(special_tokens + words)}
+
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    backend.normalizer = normalizers.Lowercase()
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        pad_token="<pad>",
+        eos_token="</s>",
+        bos_token="<s>",
+        unk_token="<unk>",
+    )
+
+    torch.manual_seed(seed)
+    config = MBartConfig(
+        vocab_size=len(vocab),
+        d_model=64,
+        encoder_layers=2,
+        decoder_layers=2,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+        max_position_embeddings=512,
+        pad_token_id=vocab["<pad>"],
+        eos_token_id=vocab["</s>"],
+        bos_token_id=vocab["<s>"],
+        decoder_start_token_id=vocab["</s>"],
+    )
+    model = MBartForConditionalGeneration(config).eval()
+
+    return pipeline("text2text-generation", model=model, tokenizer=tokenizer, device=-1)
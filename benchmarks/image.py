@@ -0,0 +1,176 @@
+import io
+import time
+import asyncio
+import argparse
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+from benchmarks.common import (
+    add_common_args, build_metadata, current_rss_mb, drive_http, enter_backend, finish, launch_server, peak_rss_mb,
+    time_calls
+)
+from benchmarks.fixtures import synthetic_jpegs, tiny_vit_config, tiny_vit_processor, write_jpegs
+
+
+async def run_http(app, args: argparse.Namespace, payloads: List[bytes]) -> List[Dict]:
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=300)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=300)
+
+    records = []
+    async with client:
+
+        async def send_single(i: int):
+            payload = payloads[i % len(payloads)]
+            return await client.post("/predict", files={"file": (f"{i}.jpg", payload, "image/jpeg")})
+
+        async def send_multi(i: int):
+            files = [
+                ("files", (f"{i}_{j}.jpg", payloads[(i + j) % len(payloads)], "image/jpeg"))
+                for j in range(args.batch_size)
+            ]
+            return await client.post("/predict-multi", files=files)
+
+        for name, send, items in (("/predict", send_single, 1), ("/predict-multi", send_multi, args.batch_size)):
+            await drive_http(send, args.warmup, 1)
+            for concurrency in args.concurrency:
+                stats = await drive_http(send, args.requests, concurrency, items)
+                record = {"section": "http", "name": name, "concurrency": concurrency, **stats}
+                if not args.url:
+                    record["rss_mb"] = round(current_rss_mb(), 1)
+                records.append(record)
+                print(f"  {name} @ c={concurrency}: {stats}")
+
+    return records
+
+
+def tiny_load_model(checkpoint_path, optimizer=None, model_kwargs=None, device="cpu"):
+    from src.model import ImageClassifier
+
+    model = ImageClassifier(num_classes=model_kwargs["num_classes"], config=tiny_vit_config()).to(device).eval()
+    return model, None, None
+
+
+async def run_service(args: argparse.Namespace, payloads: List[bytes]) -> List[Dict]:
+    """Start the in-process app through its real lifespan hook (unless --url), then run the HTTP benchmarks."""
+    records = []
+    app = None
+
+    async with AsyncExitStack() as stack:
+        if not args.url:
+            start = time.perf_counter()
+            import app as app_module
+            # The lifespan hook runs as in production, with loaders swapped for the tiny ViT instead of ViT-Base
+            stack.enter_context(patch.object(app_module, "load_model", tiny_load_model))
+            stack.enter_context(patch.object(app_module, "CASCADE_CONFIG_PATH", ""))
+            stack.enter_context(patch.object(
+                app_module, "AutoImageProcessor", SimpleNamespace(from_pretrained=lambda *args, **kwargs: tiny_vit_processor())
+            ))
+            app = app_module.app
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            records.append({
+                "section": "startup",
+                "name": "image_app",
+                "seconds": round(time.perf_counter() - start, 3),
+                "rss_mb": round(current_rss_mb(), 1),
+            })
+
+        if not args.skip_http:
+            print(f"🌐 HTTP benchmarks ({args.url or 'in-process'})")
+            records.extend(await run_http(app, args, payloads))
+
+    return records
+
+
+def run_micro(model, processor, args: argparse.Namespace, payloads: List[bytes]) -> List[Dict]:
+    from src.predict import predict
+    from src.dataset import collate_fn
+
+    images = [Image.open(io.BytesIO(p)).convert("RGB") for p in payloads[:args.batch_size]]
+    timing = {"iterations": args.iterations, "warmup": args.warmup}
+    records = []
+
+    stats = time_calls(lambda: predict(model, processor, images[:1], device="cpu"), **timing)
+    records.append({"section": "micro", "name": "predict", **stats})
+
+    stats = time_calls(lambda: predict(model, processor, images, device="cpu"), items_per_call=len(images), **timing)
+    records.append({"section": "micro", "name": f"predict_x{len(images)}", **stats})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_jpegs(tmp_dir, args.batch_size, args.seed)
+        batch = [(path, i % 2) for i, path in enumerate(paths)]
+        stats = time_calls(lambda: collate_fn(batch, processor), items_per_call=len(batch), **timing)
+        records.append({"section": "micro", "name": f"collate_fn_x{len(batch)}", **stats})
+
+    for record in records:
+        record["rss_mb"] = round(current_rss_mb(), 1)
+    return records
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the image classification service on CPU with a tiny local ViT.")
+    add_common_args(parser)
+    parser.add_argument("--batch_size", type=int, default=8, help="Images per /predict-multi request and batch micro-benchmark")
+    return parser.parse_args()
+
+
+def main(args: Optional[argparse.Namespace] = None) -> int:
+    args = args or parse_args()
+    if args.launch and args.url:
+        raise SystemExit("--launch starts its own server; it cannot be combined with --url")
+    backend_dir = enter_backend("image_classification", args)
+
+    import torch
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+
+    payloads = synthetic_jpegs(max(args.batch_size, 8), args.seed)
+    records: List[Dict] = []
+
+    server = None
+    if args.launch:
+        server, seconds = launch_server(backend_dir, args.port)
+        args.url = f"http://127.0.0.1:{args.port}"
+        records.append({"section": "startup", "name": "image_app_uvicorn", "seconds": round(seconds, 3)})
+
+    try:
+        records.extend(asyncio.run(run_service(args, payloads)))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if not args.skip_micro:
+        if args.url:
+            # Micro-benchmarks always use the tiny ViT, also when the HTTP runs targeted a server
+            model, _, _ = tiny_load_model(None, model_kwargs={"num_classes": 2})
+            processor = tiny_vit_processor()
+        else:
+            import app as app_module
+            model, processor = app_module.MODEL, app_module.PROCESSOR
+        print("⏱️ Micro-benchmarks")
+        records.extend(run_micro(model, processor, args, payloads))
+
+    results = {
+        "meta": build_metadata({
+            "suite": "image_classification",
+            "target": args.url or "in-process",
+            "model": "ViT-Base (uvicorn)" if args.launch else "tiny-vit (local config)",
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "args": vars(args),
+        }),
+        "records": records,
+    }
+    return finish(results, args.output, args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from unittest.mock import patch
+from contextlib import AsyncExitStack, ExitStack
+from typing import Dict, List, Optional
+
+from benchmarks.common import (
+    add_common_args, build_metadata, current_rss_mb, drive_http, enter_backend, finish, launch_server, peak_rss_mb,
+    time_calls
+)
+from benchmarks.fixtures import load_vietnamese_sentences, tiny_correction_pipeline, vietnamese_texts
+
+
+async def run_http(app, args: argparse.Namespace, texts: List[str], sentences: List[str]) -> List[Dict]:
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=300)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=300)
+
+    records = []
+    async with client:
+
+        async def send_correction(i: int):
+            return await client.post("/correction", params={"text": texts[i % len(texts)]})
+
+        async def send_tts(i: int):
+            return await client.post("/tts", data={"text": sentences[i % len(sentences)]})
+
+        endpoints = [("/correction", send_correction)]
+        if not args.skip_tts:
+            endpoints.append(("/tts", send_tts))
+
+        for name, send in endpoints:
+            await drive_http(send, args.warmup, 1)
+            for concurrency in args.concurrency:
+                stats = await drive_http(send, args.requests, concurrency)
+                record = {"section": "http", "name": name, "concurrency": concurrency, **stats}
+                if not args.url:
+                    record["rss_mb"] = round(current_rss_mb(), 1)
+                records.append(record)
+                print(f"  {name} @ c={concurrency}: {stats}")
+
+    return records
+
+
+def patch_corrector_loaders(stack: ExitStack, seed: int) -> None:
+    """Make load_corrector() build the tiny MBart, for either backend, instead of downloading the real model."""
+    import src.correction as correction_module
+    from src.correction_engine import CorrectionEngine
+
+    def from_pretrained(cls, model_name: str, **kwargs):
+        tiny = tiny_correction_pipeline(seed)
+        return cls(tiny.model, tiny.tokenizer, **kwargs)
+
+    stack.enter_context(patch.object(correction_module, "pipeline", lambda *args, **kwargs: tiny_correction_pipeline(seed)))
+    stack.enter_context(patch.object(CorrectionEngine, "from_pretrained", classmethod(from_pretrained)))
+
+
+async def run_service(args: argparse.Namespace, texts: List[str], sentences: List[str], start: float) -> List[Dict]:
+    """Start the in-process app through its real lifespan hook (unless --url), then run the HTTP benchmarks.
+
+    `start` is taken before src.correction is first imported, so startup includes that import.
+    """
+    records = []
+    app = None
+
+    async with AsyncExitStack() as stack:
+        if not args.url:
+            import app as app_module
+            app = app_module.app
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            records.append({
+                "section": "startup",
+                "name": "speech_app",
+                "seconds": round(time.perf_counter() - start, 3),
+                "rss_mb": round(current_rss_mb(), 1),
+            })
+
+        if not args.skip_http:
+            print(f"🌐 HTTP benchmarks ({args.url or 'in-process'})")
+            records.extend(await run_http(app, args, texts, sentences))
+
+    return records
+
+
+def run_micro(args: argparse.Namespace, texts: List[str], sentences: List[str]) -> List[Dict]:
+    from src.correction import correction
+
+    timing = {"iterations": args.iterations, "warmup": args.warmup}
+    records = []
+
+    samples = iter(texts * (args.iterations + args.warmup))
+    stats = time_calls(lambda: correction(next(samples)), **timing)
+    records.append({"section": "micro", "name": "correction", **stats})
+
+    if not args.skip_tts:
+        from src.tts import text_to_wav
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = os.path.join(tmp_dir, "benchmark.wav")
+            samples = iter(sentences * (args.iterations + args.warmup))
+            stats = time_calls(lambda: text_to_wav(next(samples), wav_path), **timing)
+            records.append({"section": "micro", "name": "text_to_wav", **stats})
+
+    for record in records:
+        record["rss_mb"] = round(current_rss_mb(), 1)
+    return records
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Vietnamese correction + TTS service on CPU with a tiny local corrector.")
+    add_common_args(parser)
+    parser.add_argument("--correction_cache", action="store_true", help="Keep the correction cache (and CORRECTION_BYPASS, if set) enabled")
+    parser.add_argument("--correction_backend", type=str, choices=["pipeline", "engine"], default="pipeline", help="Corrector backend behind /correction and correction()")
+    parser.add_argument("--skip_tts", action="store_true", help="Skip /tts and text_to_wav (e.g. when vietTTS assets are not pulled)")
+    return parser.parse_args()
+
+
+def main(args: Optional[argparse.Namespace] = None) -> int:
+    args = args or parse_args()
+    if args.launch and args.url:
+        raise SystemExit("--launch starts its own server; it cannot be combined with --url")
+    backend_dir = enter_backend("text_to_speech", args)
+    # Read by src.correction at import, and inherited by a --launch server
+    os.environ["CORRECTION_BACKEND"] = args.correction_backend
+    if not args.correction_cache:
+        # Repeated fixtures would otherwise be served from the cache instead of measuring generation
+        os.environ["CORRECTION_CACHE_SIZE"] = "0"
+        os.environ["CORRECTION_BYPASS"] = "0"
+
+    import torch
+    torch.set_num_threads(args.threads)
+
+    texts = vietnamese_texts(32, args.seed)
+    sentences = load_vietnamese_sentences()
+    records: List[Dict] = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir, ExitStack() as stack:
+        # /tts writes here instead of the tracked assets/output.wav, also in a --launch server
+        os.environ["TTS_OUTPUT_PATH"] = os.path.join(tmp_dir, "output.wav")
+
+        server = None
+        if args.launch:
+            server, seconds = launch_server(backend_dir, args.port)
+            args.url = f"http://127.0.0.1:{args.port}"
+            records.append({"section": "startup", "name": "speech_app_uvicorn", "seconds": round(seconds, 3)})
+
+        # In-process app and micro-benchmarks always use the tiny corrector
+        start = time.perf_counter()
+        patch_corrector_loaders(stack, args.seed)
+        try:
+            records.extend(asyncio.run(run_service(args, texts, sentences, start)))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        if not args.skip_micro:
+            print("⏱️ Micro-benchmarks")
+            records.extend(run_micro(args, texts, sentences))
+
+    results = {
+        "meta": build_metadata({
+            "suite": "text_to_speech",
+            "target": args.url or "in-process",
+            "model": (
+                "bmd1905/vietnamese-correction + vietTTS (uvicorn)" if args.launch
+                else "tiny-mbart corrector (local config) + bundled vietTTS assets"
+            ),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "args": vars(args),
+        }),
+        "records": records,
+    }
+    return finish(results, args.output, args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,22 @@
 import os
 import io
-from typing import List
+import shutil
+import tempfile
+from typing import List, Optional
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
 from transformers import AutoImageProcessor
 from PIL import Image
 
 from src.utils import load_model, setup_logger
-from src.predict import predict
+from src.predict import predict, predict_cascade
+from src.cascade import load_cascade
+from src.bulk import format_header, format_result, is_archive, is_valid_archive, iter_archive, iter_predictions
+from src.metrics import RequestTracker, render_metrics, time_model_load, time_stage
 
 
 logger = setup_logger("logs/app.log")
@@ -18,21 +24,34 @@ logger = setup_logger("logs/app.log")
 
 MODEL = None
 PROCESSOR = None
+CASCADE = None
+CASCADE_CONFIG_PATH = "./models/cascade.json"
+# Point at a distilled student checkpoint to serve the cheaper model
+MODEL_CHECKPOINT_PATH = os.getenv("MODEL_CHECKPOINT_PATH", "./models/best_model.pth")
+TRACKED_PATHS = {"/predict", "/predict-multi", "/predict-bulk"}
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Starlette's default is 1000; larger jobs should stream one archive as the request body
+MAX_MULTIPART_FILES = 1000
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global MODEL, PROCESSOR
+    global MODEL, PROCESSOR, CASCADE
     try:
         logger.info("Loading processor...")
-        PROCESSOR = AutoImageProcessor.from_pretrained("google/vit-base-patch16-224-in21k")
+        with time_model_load("processor"):
+            PROCESSOR = AutoImageProcessor.from_pretrained("google/vit-base-patch16-224-in21k")
         logger.info("Loading model...")
-        MODEL, _, _ = load_model(
-            checkpoint_path="./models/best_model.pth",
-            optimizer=None,
-            model_kwargs={"model_name": "google/vit-base-patch16-224-in21k", "num_classes": 2},
-            device="cpu"
-        )
+        with time_model_load("classifier"):
+            MODEL, _, _ = load_model(
+                checkpoint_path=MODEL_CHECKPOINT_PATH,
+                optimizer=None,
+                model_kwargs={"model_name": "google/vit-base-patch16-224-in21k", "num_classes": 2},
+                device="cpu"
+            )
+        if os.path.exists(CASCADE_CONFIG_PATH):
+            logger.info("Loading cascade...")
+            CASCADE = load_cascade(CASCADE_CONFIG_PATH, MODEL, PROCESSOR, device="cpu")
         logger.info("✅ Model and processor loaded successfully.")
         yield
     finally:
@@ -50,12 +69,32 @@ app.add_middleware(
 )
 
 
+app.add_middleware(RequestTracker, tracked_paths=TRACKED_PATHS)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Single image prediction
 @app.post("/predict", response_class=JSONResponse)
-async def predict_image(file: UploadFile = File(...)):
+async def predict_image(file: UploadFile = File(...), cascade: bool = True):
     try:
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents)).convert("RGB")
+        with time_stage("upload_read"):
+            contents = await file.read()
+        with time_stage("decode"):
+            image = Image.open(io.BytesIO(contents)).convert("RGB")
+
+        if cascade and CASCADE is not None:
+            results, stages = await run_in_threadpool(predict_cascade, CASCADE, [image])
+            _, pred_class, pred_prob = results[0]
+            return {
+                "filename": file.filename,
+                "class_name": pred_class,
+                "probability": round(pred_prob, 4),
+                "stage": stages[0]
+            }
 
         results = await run_in_threadpool(predict, MODEL, PROCESSOR, [image], device="cpu")
         _, pred_class, pred_prob = results[0]
@@ -69,27 +108,124 @@ async def predict_image(file: UploadFile = File(...)):
 
 # Batch prediction
 @app.post("/predict-multi", response_class=JSONResponse)
-async def predict_images(files: List[UploadFile] = File(...)):
+async def predict_images(files: List[UploadFile] = File(...), cascade: bool = True):
     try:
         images, filenames = [], []
         for file in files:
-            contents = await file.read()
-            img = Image.open(io.BytesIO(contents)).convert("RGB")
+            with time_stage("upload_read"):
+                contents = await file.read()
+            with time_stage("decode"):
+                img = Image.open(io.BytesIO(contents)).convert("RGB")
             images.append(img)
             filenames.append(file.filename)
 
-        results = await run_in_threadpool(predict, MODEL, PROCESSOR, images, device="cpu")
+        stages = None
+        if cascade and CASCADE is not None:
+            results, stages = await run_in_threadpool(predict_cascade, CASCADE, images)
+        else:
+            results = await run_in_threadpool(predict, MODEL, PROCESSOR, images, device="cpu")
 
         response = []
-        for fname, (_, pred_class, pred_prob) in zip(filenames, results):
-            response.append({
+        for i, (fname, (_, pred_class, pred_prob)) in enumerate(zip(filenames, results)):
+            item = {
                 "filename": fname,
                 "class_name": pred_class,
                 "probability": round(pred_prob, 4)
-            })
+            }
+            if stages is not None:
+                item["stage"] = stages[i]
+            response.append(item)
 
         return {"results": response}
 
     except Exception as e:
         logger.exception("Batch prediction failed")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def save_upload(file: UploadFile, path: str) -> None:
+    with open(path, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            out.write(chunk)
+
+
+# Bulk prediction, streamed back as NDJSON (or CSV) while images are processed
+@app.post("/predict-bulk")
+async def predict_bulk(request: Request, format: str = "ndjson", cascade: bool = True, archive: Optional[str] = None):
+    """Body is either one archive streamed as-is (`archive=zip|tar`), or multipart `files` for smaller jobs.
+
+    A raw archive body is written straight to the job directory. Multipart uploads are first spooled to disk
+    by Starlette and capped at MAX_MULTIPART_FILES files, so large jobs should send an archive.
+    """
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    content_type = request.headers.get("content-type", "")
+    multipart = content_type.startswith("multipart/form-data")
+    if not multipart:
+        archive = archive or ("zip" if "zip" in content_type else "tar")
+        if archive not in ("zip", "tar"):
+            raise HTTPException(status_code=400, detail="archive must be 'zip' or 'tar' (gzip is detected)")
+
+    # Neither the request nor the response ever holds more than one batch of decoded images in memory
+    job_dir = tempfile.mkdtemp(prefix="bulk-")
+    try:
+        uploads = []
+        if multipart:
+            form = await request.form(max_files=MAX_MULTIPART_FILES)
+            try:
+                for i, file in enumerate(form.getlist("files")):
+                    path = os.path.join(job_dir, f"{i:06d}_{os.path.basename(file.filename or 'upload')}")
+                    await save_upload(file, path)
+                    uploads.append((file.filename, path))
+            finally:
+                # Drops Starlette's spooled copies as soon as they are in the job directory
+                await form.close()
+            if not uploads:
+                raise HTTPException(status_code=400, detail="no 'files' in the form")
+        else:
+            path = os.path.join(job_dir, f"upload.{archive}")
+            with open(path, "wb") as out:
+                async for chunk in request.stream():
+                    out.write(chunk)
+            uploads.append((path, path))
+
+        # Archives are only opened while streaming, after the 200 and the header are sent, so check them now
+        for filename, path in uploads:
+            if is_archive(filename or "") and not is_valid_archive(path, filename):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{os.path.basename(filename)} is not a readable zip/tar archive "
+                           "(send zip files with Content-Type: application/zip or ?archive=zip)"
+                )
+    except HTTPException:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        logger.exception("Bulk upload failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def items():
+        for filename, path in uploads:
+            if is_archive(filename or ""):
+                yield from iter_archive(path)
+            else:
+                yield filename, path
+
+    def stream():
+        try:
+            yield format_header(format)
+            results = iter_predictions(
+                items(), MODEL, PROCESSOR, device="cpu", cascade=CASCADE if cascade else None
+            )
+            for result in results:
+                yield format_result(result, format)
+        except Exception:
+            logger.exception("Bulk prediction failed")
+            raise
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    # A background task also runs when the client disconnects before the body is sent, unlike a finally in stream()
+    cleanup = BackgroundTask(shutil.rmtree, job_dir, ignore_errors=True)
+    return StreamingResponse(stream(), media_type=media_type, background=cleanup)
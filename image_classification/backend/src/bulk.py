@@ -0,0 +1,231 @@
+import io
+import os
+import csv
+import json
+import tarfile
+import zipfile
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import torch.nn as nn
+from PIL import Image
+from tqdm import tqdm
+from transformers import AutoImageProcessor
+
+from src.cascade import CascadeClassifier
+from src.metrics import time_stage
+from src.predict import predict, predict_cascade
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+# Same fields as the NDJSON rows: `stage` is set when the cascade answered, `error` for unreadable images
+CSV_HEADER = ["image_id", "predicted_label", "confidence", "stage", "error"]
+
+# (image_id, payload): payload is a file path, or the raw bytes of an archive member
+BulkItem = Tuple[str, Union[str, bytes]]
+
+
+def is_image(name: str) -> bool:
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def is_archive(name: str) -> bool:
+    return name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def iter_directory(root_dir: str, skip: int = 0) -> Iterator[BulkItem]:
+    # Sorted walk, so an interrupted job sees the same order when it resumes
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if is_image(name):
+                if skip:
+                    skip -= 1
+                    continue
+                path = os.path.join(dirpath, name)
+                yield path, path
+
+
+def iter_archive(archive_path: str, skip: int = 0) -> Iterator[BulkItem]:
+    """Yield image members one at a time; only the member being yielded is held in memory.
+
+    The first `skip` image members (already processed by a resumed job) are passed over without being read.
+    """
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [info for info in archive.infolist() if not info.is_dir() and is_image(info.filename)]
+            for info in members[skip:]:
+                yield info.filename, archive.read(info)
+    else:
+        # Stream mode reads the tarball sequentially instead of indexing every member up front;
+        # skipped members are still scanned past, but never extracted
+        with tarfile.open(archive_path, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile() and is_image(member.name):
+                    if skip:
+                        skip -= 1
+                        continue
+                    yield member.name, archive.extractfile(member).read()
+
+
+def iter_source(source: str, skip: int = 0) -> Iterator[BulkItem]:
+    if os.path.isdir(source):
+        return iter_directory(source, skip)
+    if is_archive(source):
+        return iter_archive(source, skip)
+    raise ValueError(f"Bulk input must be a directory or an archive ({', '.join(ARCHIVE_EXTENSIONS)}): {source}")
+
+
+def _decode(item: BulkItem) -> Tuple[str, Optional[Image.Image], Optional[str]]:
+    image_id, payload = item
+    try:
+        with time_stage("decode"):
+            image = Image.open(payload if isinstance(payload, str) else io.BytesIO(payload)).convert("RGB")
+        return image_id, image, None
+    except Exception as e:
+        return image_id, None, str(e)
+
+
+def iter_predictions(
+    items: Iterable[BulkItem],
+    model: nn.Module,
+    processor: AutoImageProcessor,
+    batch_size: int = 32,
+    device: str = "cpu",
+    cascade: Optional[CascadeClassifier] = None,
+    num_workers: int = 4
+) -> Iterator[Dict]:
+    """Predict lazily in batches, so at most `batch_size` decoded images are alive at any time."""
+    items = iter(items)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        while True:
+            batch = list(itertools.islice(items, batch_size))
+            if not batch:
+                break
+
+            decoded = list(pool.map(_decode, batch))
+            images = [image for _, image, _ in decoded if image is not None]
+
+            stages = None
+            if not images:
+                predictions = []
+            elif cascade is not None:
+                predictions, stages = predict_cascade(cascade, images, batch_size=batch_size)
+            else:
+                predictions = predict(model, processor, images, device=device)
+
+            answered = iter(range(len(predictions)))
+            for image_id, image, error in decoded:
+                if error is not None:
+                    yield {"image_id": image_id, "error": error}
+                    continue
+                i = next(answered)
+                _, pred_class, pred_prob = predictions[i]
+                result = {"image_id": image_id, "class_name": pred_class, "probability": round(pred_prob, 4)}
+                if stages is not None:
+                    result["stage"] = stages[i]
+                yield result
+
+
+def output_format(path: str) -> str:
+    return "ndjson" if path.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def format_header(fmt: str) -> str:
+    return ",".join(CSV_HEADER) + "\r\n" if fmt == "csv" else ""
+
+
+def format_result(result: Dict, fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps(result, ensure_ascii=False) + "\n"
+
+    buffer = io.StringIO()
+    if "error" in result:
+        csv.writer(buffer).writerow([result["image_id"], "", "", "", result["error"]])
+    else:
+        csv.writer(buffer).writerow([
+            result["image_id"], result["class_name"], f"{result['probability']:.4f}", result.get("stage", ""), ""
+        ])
+    return buffer.getvalue()
+
+
+def is_valid_archive(path: str, name: str) -> bool:
+    """Cheap header check, so a corrupt or mislabelled archive is rejected before any result is streamed."""
+    if name.lower().endswith(".zip"):
+        return zipfile.is_zipfile(path)
+    return tarfile.is_tarfile(path)
+
+
+def _save_checkpoint(checkpoint_path: str, state: Dict) -> None:
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def run_bulk_job(
+    source: str,
+    output_path: str,
+    model: nn.Module,
+    processor: AutoImageProcessor,
+    batch_size: int = 32,
+    checkpoint_every: int = 1000,
+    resume: bool = True,
+    device: str = "cpu",
+    cascade: Optional[CascadeClassifier] = None
+) -> int:
+    """Classify every image in `source`, appending rows to `output_path` and checkpointing progress.
+
+    The checkpoint records how many items were written and the output size at that point, so a resumed
+    job drops any rows written after the last checkpoint and skips the items already done.
+    """
+    fmt = output_format(output_path)
+    checkpoint_path = output_path + ".checkpoint.json"
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    processed, errors = 0, 0
+    if resume and os.path.exists(checkpoint_path) and os.path.exists(output_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("source") == os.path.abspath(source):
+            if state.get("completed"):
+                print(f"✅ Bulk job already completed ({state['processed']} images) → {output_path}")
+                return state["processed"]
+            processed, errors = state["processed"], state.get("errors", 0)
+            with open(output_path, "r+b") as f:
+                f.truncate(state["output_bytes"])
+            print(f"🔄 Resuming bulk job after {processed} images")
+
+    if processed == 0:
+        with open(output_path, "w", newline="", encoding="utf-8") as f:
+            f.write(format_header(fmt))
+
+    def checkpoint(f, completed: bool = False) -> None:
+        f.flush()
+        os.fsync(f.fileno())
+        _save_checkpoint(checkpoint_path, {
+            "source": os.path.abspath(source),
+            "processed": processed,
+            "errors": errors,
+            "output_bytes": os.path.getsize(output_path),
+            "completed": completed,
+        })
+
+    results = iter_predictions(iter_source(source, skip=processed), model, processor, batch_size=batch_size, device=device, cascade=cascade)
+
+    with open(output_path, "a", newline="", encoding="utf-8") as f:
+        for result in tqdm(results, desc="Bulk predict", unit="img", initial=processed):
+            f.write(format_result(result, fmt))
+            processed += 1
+            errors += "error" in result
+            if processed % checkpoint_every == 0:
+                checkpoint(f)
+        checkpoint(f, completed=True)
+
+    print(f"✅ Bulk job finished: {processed} images ({errors} unreadable) → {output_path}")
+    return processed
@@ -0,0 +1,118 @@
+import argparse
+
+import torch
+from transformers import AutoImageProcessor
+
+from src.cascade import build_first_stage, choose_threshold, save_cascade_config
+from src.dataset import load_dataloader
+from src.evaluate import collect_probs
+from src.utils import load_model
+
+
+def accuracy(probs: torch.Tensor, labels: torch.Tensor) -> float:
+    return (probs.argmax(dim=-1) == labels).float().mean().item()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Calibrate the cascade threshold on the validation split for a target accuracy."
+    )
+
+    parser.add_argument("--root_dir", type=str, required=True, help="Path to dataset root directory")
+    parser.add_argument("--train_ratio", type=float, default=0.9, help="Ratio of data used for training (rest is validation/test)")
+    parser.add_argument("--batch_size", type=int, default=32, help="Batch size for evaluation")
+    parser.add_argument("--num_workers", type=int, default=0, help="Number of workers for DataLoader")
+
+    parser.add_argument("--model_name", type=str, default="google/vit-base-patch16-224-in21k", help="Model name or path (e.g., Hugging Face model checkpoint)")
+    parser.add_argument("--num_classes", type=int, default=2, help="Number of output classes")
+    parser.add_argument("--checkpoint_path", type=str, required=True, help="Path to the trained model checkpoint (.pth)")
+
+    parser.add_argument("--resolution", type=int, default=112, help="Input resolution of the low-res first stage")
+    parser.add_argument("--student_checkpoint", type=str, default=None, help="Distilled student checkpoint to use as first stage instead of the low-res ViT")
+    parser.add_argument("--target_accuracy", type=float, default=None, help="Required cascade accuracy (default: accuracy of the full model)")
+    parser.add_argument("--output_path", type=str, default="models/cascade.json", help="Where to write the cascade config")
+
+    parser.add_argument("--device", type=str, choices=["cpu", "cuda"], default=None, help="Device to use for calibration (default: auto-detect)")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    device = args.device or ("cuda" if torch.cuda.is_available() else "cpu")
+
+    processor = AutoImageProcessor.from_pretrained(args.model_name)
+    model, _, _ = load_model(
+        checkpoint_path=args.checkpoint_path,
+        optimizer=None,
+        model_kwargs={"model_name": args.model_name, "num_classes": args.num_classes},
+        device=device,
+    )
+
+    if args.student_checkpoint:
+        first_stage = {"type": "student", "checkpoint_path": args.student_checkpoint}
+    else:
+        first_stage = {"type": "low_res", "resolution": args.resolution}
+    fast_model, fast_processor = build_first_stage(first_stage, model, processor)
+
+    # Validation loaders are not shuffled, so both passes see the images in the same order
+    _, full_loader = load_dataloader(
+        root_dir=args.root_dir,
+        processor=processor,
+        batch_size=args.batch_size,
+        train_ratio=args.train_ratio,
+        seed=42,
+        num_workers=args.num_workers,
+    )
+    _, fast_loader = load_dataloader(
+        root_dir=args.root_dir,
+        processor=fast_processor,
+        batch_size=args.batch_size,
+        train_ratio=args.train_ratio,
+        seed=42,
+        num_workers=args.num_workers,
+    )
+
+    full_probs, labels, full_seconds = collect_probs(model, full_loader, device)
+    fast_probs, _, fast_seconds = collect_probs(fast_model, fast_loader, device)
+
+    full_accuracy = accuracy(full_probs, labels)
+    fast_accuracy = accuracy(fast_probs, labels)
+    target_accuracy = args.target_accuracy if args.target_accuracy is not None else full_accuracy
+
+    result = choose_threshold(
+        fast_probs=fast_probs,
+        full_probs=full_probs,
+        labels=labels,
+        target_accuracy=target_accuracy,
+        fast_cost=fast_seconds,
+        full_cost=full_seconds,
+    )
+
+    print("\n📊 Cascade calibration:")
+    print(f"Full model accuracy:  {full_accuracy:.4f} ({full_seconds / len(labels) * 1000:.2f} ms/image)")
+    print(f"First stage accuracy: {fast_accuracy:.4f} ({fast_seconds / len(labels) * 1000:.2f} ms/image)")
+
+    if result is None:
+        print(f"❌ No threshold reaches target accuracy {target_accuracy:.4f}; cascade config not written.")
+    else:
+        print(f"Threshold:            {result['threshold']:.4f}")
+        print(f"Cascade accuracy:     {result['cascade_accuracy']:.4f} (target {target_accuracy:.4f})")
+        print(f"Escalation rate:      {result['escalation_rate']:.2%}")
+        print(f"Expected savings:     {result['expected_savings']:.2%} of full-model compute")
+
+        # The app loads any cascade.json it finds, so a cascade slower than the full model must not be written
+        if result["expected_savings"] <= 0:
+            print("❌ First stage plus escalations cost more than the full model alone; cascade config not written.")
+        else:
+            save_cascade_config(
+                {
+                    "first_stage": first_stage,
+                    **result,
+                    "target_accuracy": target_accuracy,
+                    "full_accuracy": full_accuracy,
+                    "first_stage_accuracy": fast_accuracy,
+                    "num_samples": len(labels),
+                },
+                args.output_path,
+            )
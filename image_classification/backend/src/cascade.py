@@ -0,0 +1,158 @@
+import copy
+import json
+from typing import Dict, List, Optional, Tuple
+
+import torch
+import torch.nn as nn
+from PIL import Image
+from transformers import AutoImageProcessor
+
+from src.metrics import CASCADE_DECISIONS, time_stage
+from src.utils import load_model
+
+
+DEFAULT_FIRST_STAGE = {"type": "low_res", "resolution": 112}
+
+
+class CascadeClassifier:
+    """Answer with a cheap first stage when it is confident enough, otherwise escalate to the full model."""
+
+    def __init__(
+        self,
+        fast_model: nn.Module,
+        fast_processor: AutoImageProcessor,
+        full_model: nn.Module,
+        full_processor: AutoImageProcessor,
+        threshold: float = 0.95,
+        device: str = "cpu"
+    ) -> None:
+        self.fast_model = fast_model.eval().to(device)
+        self.fast_processor = fast_processor
+        self.full_model = full_model.eval().to(device)
+        self.full_processor = full_processor
+        self.threshold = threshold
+        self.device = device
+
+    def __call__(self, images: List[Image.Image]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Return class probabilities [N, C] and a bool mask [N] of the images that were escalated."""
+        with torch.no_grad():
+            with time_stage("cascade_fast"):
+                inputs = self.fast_processor(images=images, return_tensors="pt")["pixel_values"].to(self.device)
+                probs = torch.softmax(self.fast_model(inputs), dim=-1)
+
+            escalated = probs.max(dim=-1).values < self.threshold
+            if escalated.any():
+                hard_images = [images[i] for i in escalated.nonzero().flatten().tolist()]
+                with time_stage("cascade_full"):
+                    inputs = self.full_processor(images=hard_images, return_tensors="pt")["pixel_values"].to(self.device)
+                    probs[escalated] = torch.softmax(self.full_model(inputs), dim=-1)
+
+        n_escalated = int(escalated.sum().item())
+        CASCADE_DECISIONS.inc("fast", amount=len(images) - n_escalated)
+        CASCADE_DECISIONS.inc("full", amount=n_escalated)
+        return probs.cpu(), escalated.cpu()
+
+
+def build_first_stage(
+    first_stage: Dict,
+    full_model: nn.Module,
+    full_processor: AutoImageProcessor
+) -> Tuple[nn.Module, AutoImageProcessor]:
+
+    stage_type = first_stage.get("type", "low_res")
+
+    if stage_type == "low_res":
+        # Same weights on fewer patches: 112px gives 49 tokens instead of 196
+        resolution = first_stage.get("resolution", DEFAULT_FIRST_STAGE["resolution"])
+        processor = copy.deepcopy(full_processor)
+        processor.size = {"height": resolution, "width": resolution}
+        return full_model, processor
+
+    if stage_type == "student":
+        # Distilled student trained on the teacher's 224px preprocessing
+        num_classes = full_model.classifier[-1].out_features
+        student, _, _ = load_model(
+            checkpoint_path=first_stage["checkpoint_path"],
+            optimizer=None,
+            model_kwargs={"num_classes": num_classes},
+            device=next(full_model.parameters()).device.type
+        )
+        return student, full_processor
+
+    raise ValueError(f"Unknown cascade first stage type: {stage_type}")
+
+
+def load_cascade(
+    config_path: str,
+    full_model: nn.Module,
+    full_processor: AutoImageProcessor,
+    device: str = "cpu"
+) -> CascadeClassifier:
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    fast_model, fast_processor = build_first_stage(
+        config.get("first_stage", DEFAULT_FIRST_STAGE), full_model, full_processor
+    )
+    print(f"✅ Cascade loaded from {config_path} (threshold={config['threshold']:.4f})")
+
+    return CascadeClassifier(
+        fast_model=fast_model,
+        fast_processor=fast_processor,
+        full_model=full_model,
+        full_processor=full_processor,
+        threshold=config["threshold"],
+        device=device,
+    )
+
+
+def save_cascade_config(config: Dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    print(f"✅ Cascade config saved to {path}")
+
+
+def choose_threshold(
+    fast_probs: torch.Tensor,
+    full_probs: torch.Tensor,
+    labels: torch.Tensor,
+    target_accuracy: float,
+    fast_cost: float,
+    full_cost: float
+) -> Optional[Dict[str, float]]:
+    """Lowest threshold whose cascade accuracy reaches `target_accuracy`, with its expected cost.
+
+    Escalating everything (no first-stage answer accepted) is not a cascade, so it is never returned.
+    """
+    fast_conf, fast_pred = fast_probs.max(dim=-1)
+    full_pred = full_probs.argmax(dim=-1)
+    n = len(labels)
+
+    # Accepting the k most confident first-stage answers is optimal for a given escalation budget
+    order = torch.argsort(fast_conf, descending=True)
+    fast_correct = (fast_pred == labels)[order].float()
+    full_correct = (full_pred == labels)[order].float()
+    zero = torch.zeros(1)
+    correct_if_accepted = torch.cat([zero, fast_correct.cumsum(0)])
+    correct_if_escalated = torch.cat([zero, full_correct.flip(0).cumsum(0)]).flip(0)
+    accuracy = (correct_if_accepted + correct_if_escalated) / n
+
+    sorted_conf = fast_conf[order]
+    for k in range(n, 0, -1):
+        # Ties would be accepted together, so only cut between distinct confidences
+        if k < n and sorted_conf[k - 1] == sorted_conf[k]:
+            continue
+        if accuracy[k] >= target_accuracy:
+            threshold = sorted_conf[k - 1].item()
+            escalation_rate = (n - k) / n
+            relative_cost = (fast_cost + escalation_rate * full_cost) / full_cost
+            return {
+                "threshold": threshold,
+                "cascade_accuracy": accuracy[k].item(),
+                "escalation_rate": escalation_rate,
+                "relative_cost": relative_cost,
+                "expected_savings": 1.0 - relative_cost,
+            }
+
+    return None
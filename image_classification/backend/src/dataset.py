@@ -1,4 +1,4 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import torch
 from torch.utils.data import DataLoader, Dataset
@@ -27,6 +27,20 @@ class CatDogDataset(Dataset):
         return self.samples[idx] 
     
 
+class DistillationDataset(Dataset):
+    
+    def __init__(self, dataset: CatDogDataset, teacher_logits: Dict[str, torch.Tensor]):
+        self.dataset = dataset
+        self.teacher_logits = teacher_logits
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __getitem__(self, idx: int):
+        img_path, label = self.dataset[idx]
+        return img_path, label, self.teacher_logits[img_path]
+
+
 def collate_fn(batch: list, processor: AutoImageProcessor):
     images = []
     labels = []
@@ -43,13 +57,21 @@ def collate_fn(batch: list, processor: AutoImageProcessor):
     return pixel_values, labels
 
 
+def distillation_collate_fn(batch: list, processor: AutoImageProcessor):
+    pixel_values, labels = collate_fn([(img_path, label) for img_path, label, _ in batch], processor)
+    teacher_logits = torch.stack([logits for _, _, logits in batch])
+
+    return pixel_values, labels, teacher_logits
+
+
 def load_dataloader(
     root_dir: str,
     processor: AutoImageProcessor,
     batch_size: int = 32,
     train_ratio: float = 0.9,
     seed: int = 42,
-    num_workers: int = 2
+    num_workers: int = 2,
+    teacher_logits: Optional[Dict[str, torch.Tensor]] = None
 ) -> Tuple[DataLoader, DataLoader]:
     
     data_dict = load_image_paths(root_dir)
@@ -58,12 +80,18 @@ def load_dataloader(
     train_dataset = CatDogDataset(train_dict)
     val_dataset = CatDogDataset(val_dict)
 
+    # With cached teacher logits, training batches become (pixel_values, labels, teacher_logits)
+    train_collate = collate_fn
+    if teacher_logits is not None:
+        train_dataset = DistillationDataset(train_dataset, teacher_logits)
+        train_collate = distillation_collate_fn
+
     train_dataloader = DataLoader(
         train_dataset,
         batch_size=batch_size,
         shuffle=True,
         num_workers=num_workers,
-        collate_fn=lambda batch: collate_fn(batch, processor)
+        collate_fn=lambda batch: train_collate(batch, processor)
     )
 
     val_dataloader = DataLoader(
@@ -0,0 +1,144 @@
+import os
+import hashlib
+from typing import Dict, List, Optional
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from PIL import Image
+from torch.utils.data import DataLoader
+from tqdm import tqdm
+from transformers import AutoImageProcessor
+
+from src.evaluate import collect_probs
+
+
+class DistillationLoss(nn.Module):
+    """Hinton-style KD: alpha * T^2 * KL(teacher || student) at temperature T + (1 - alpha) * CE on labels."""
+
+    def __init__(self, temperature: float = 4.0, alpha: float = 0.7) -> None:
+        super(DistillationLoss, self).__init__()
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def forward(
+        self,
+        student_logits: torch.Tensor,
+        labels: torch.Tensor,
+        teacher_logits: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        ce_loss = F.cross_entropy(student_logits, labels)
+        # Validation batches carry no teacher logits and are scored on labels only
+        if teacher_logits is None:
+            return ce_loss
+
+        t = self.temperature
+        kd_loss = F.kl_div(
+            F.log_softmax(student_logits / t, dim=-1),
+            F.log_softmax(teacher_logits / t, dim=-1),
+            reduction="batchmean",
+            log_target=True
+        ) * (t * t)
+        return self.alpha * kd_loss + (1 - self.alpha) * ce_loss
+
+
+def compute_teacher_logits(
+    teacher: nn.Module,
+    processor: AutoImageProcessor,
+    image_paths: List[str],
+    batch_size: int = 32,
+    device: str = "cuda"
+) -> torch.Tensor:
+
+    teacher.eval()
+    teacher.to(device)
+    all_logits = []
+
+    with torch.no_grad():
+        for start in tqdm(range(0, len(image_paths), batch_size), desc="Teacher logits", unit="batch"):
+            images = [Image.open(path).convert("RGB") for path in image_paths[start:start + batch_size]]
+            inputs = processor(images=images, return_tensors="pt")["pixel_values"].to(device)
+            all_logits.append(teacher(inputs).float().cpu())
+
+    return torch.cat(all_logits)
+
+
+def teacher_fingerprint(teacher_checkpoint: str, model_name: str, chunk_size: int = 1024 * 1024) -> str:
+    """sha256 of the checkpoint contents plus the backbone name, so a checkpoint retrained in place invalidates the cache."""
+    digest = hashlib.sha256(f"{model_name}\n".encode("utf-8"))
+    with open(teacher_checkpoint, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_or_compute_teacher_logits(
+    cache_path: str,
+    teacher_checkpoint: str,
+    model_name: str,
+    teacher: nn.Module,
+    processor: AutoImageProcessor,
+    image_paths: List[str],
+    batch_size: int = 32,
+    device: str = "cuda"
+) -> Dict[str, torch.Tensor]:
+    """Teacher logits keyed by image path, computed once and reused from `cache_path` while the teacher is unchanged."""
+    fingerprint = teacher_fingerprint(teacher_checkpoint, model_name)
+    if os.path.exists(cache_path):
+        cache = torch.load(cache_path, map_location="cpu")
+        cached = dict(zip(cache["paths"], cache["logits"]))
+        if cache.get("teacher_fingerprint") == fingerprint and all(p in cached for p in image_paths):
+            print(f"✅ Teacher logits loaded from {cache_path}")
+            return cached
+        print(f"⚠️ Teacher logits in {cache_path} do not match this teacher/dataset, recomputing")
+
+    logits = compute_teacher_logits(teacher, processor, image_paths, batch_size, device)
+
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    torch.save(
+        {
+            "teacher_checkpoint": teacher_checkpoint,
+            "teacher_fingerprint": fingerprint,
+            "paths": list(image_paths),
+            "logits": logits
+        },
+        cache_path
+    )
+    print(f"✅ Teacher logits saved to {cache_path}")
+
+    return dict(zip(image_paths, logits))
+
+
+def count_parameters(model: nn.Module) -> int:
+    return sum(p.numel() for p in model.parameters())
+
+
+def report_distillation(
+    teacher: nn.Module,
+    student: nn.Module,
+    dataloader: DataLoader,
+    device: str = "cuda"
+) -> Dict[str, float]:
+    """Accuracy, size and forward-time comparison of teacher and student on the same split."""
+    teacher_probs, labels, teacher_seconds = collect_probs(teacher, dataloader, device)
+    student_probs, _, student_seconds = collect_probs(student, dataloader, device)
+
+    report = {
+        "teacher_accuracy": (teacher_probs.argmax(dim=-1) == labels).float().mean().item(),
+        "student_accuracy": (student_probs.argmax(dim=-1) == labels).float().mean().item(),
+        "teacher_params": count_parameters(teacher),
+        "student_params": count_parameters(student),
+        "teacher_ms_per_image": teacher_seconds / len(labels) * 1000,
+        "student_ms_per_image": student_seconds / len(labels) * 1000,
+    }
+    report["accuracy_gap"] = report["teacher_accuracy"] - report["student_accuracy"]
+    report["speedup"] = teacher_seconds / student_seconds if student_seconds > 0 else float("inf")
+
+    print("\n📊 Distillation Report:")
+    print(f"Teacher: acc {report['teacher_accuracy']:.4f} | {report['teacher_params'] / 1e6:.1f}M params | {report['teacher_ms_per_image']:.2f} ms/image")
+    print(f"Student: acc {report['student_accuracy']:.4f} | {report['student_params'] / 1e6:.1f}M params | {report['student_ms_per_image']:.2f} ms/image")
+    print(f"Accuracy gap: {report['accuracy_gap']:.4f} | Speedup: {report['speedup']:.1f}x")
+
+    return report
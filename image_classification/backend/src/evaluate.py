@@ -1,5 +1,6 @@
+import time
 import argparse
-from typing import List
+from typing import List, Tuple
 
 import torch
 import torch.nn as nn
@@ -12,23 +13,40 @@ from src.dataset import load_dataloader
 from src.utils import load_model
 
 
-def evaluate(
+def collect_probs(
     model: nn.Module,
     dataloader: DataLoader,
-    class_names: List[str],
     device: str = "cuda"
-) -> None:
+) -> Tuple[torch.Tensor, torch.Tensor, float]:
+    """Softmax probabilities and labels for the whole dataloader, plus the time spent in forward passes."""
     model.eval()
-    y_true, y_pred = [], []
+    all_probs, all_labels = [], []
+    forward_seconds = 0.0
 
     with torch.no_grad():
         for inputs, labels in tqdm(dataloader, desc="Evaluating", unit="batch"):
-            inputs, labels = inputs.to(device), labels.to(device)
+            inputs = inputs.to(device)
+            start = time.perf_counter()
             outputs = model(inputs)
-            _, preds = torch.max(outputs, dim=1)
+            if inputs.is_cuda:
+                torch.cuda.synchronize()
+            forward_seconds += time.perf_counter() - start
+
+            all_probs.append(torch.softmax(outputs, dim=-1).cpu())
+            all_labels.append(labels)
+
+    return torch.cat(all_probs), torch.cat(all_labels), forward_seconds
+
 
-            y_true.extend(labels.cpu().numpy())
-            y_pred.extend(preds.cpu().numpy())
+def evaluate(
+    model: nn.Module,
+    dataloader: DataLoader,
+    class_names: List[str],
+    device: str = "cuda"
+) -> None:
+    probs, labels, _ = collect_probs(model, dataloader, device)
+    y_true = labels.numpy()
+    y_pred = probs.argmax(dim=-1).numpy()
 
     # In classification report
     report = classification_report(y_true, y_pred, target_names=class_names, digits=4)
@@ -1,19 +1,38 @@
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 import torch
 import torch.nn as nn
-from transformers import ViTModel, AutoImageProcessor
+from transformers import ViTConfig, ViTModel, AutoImageProcessor
+
+
+# Locally configured students for distillation (patch16 at 224px, same processor as the teacher)
+STUDENT_CONFIGS: Dict[str, Dict[str, int]] = {
+    "vit-tiny": {"hidden_size": 192, "num_hidden_layers": 12, "num_attention_heads": 3, "intermediate_size": 768},
+    "vit-tiny-6l": {"hidden_size": 192, "num_hidden_layers": 6, "num_attention_heads": 3, "intermediate_size": 768},
+    "vit-small": {"hidden_size": 384, "num_hidden_layers": 12, "num_attention_heads": 6, "intermediate_size": 1536},
+}
+
+
+def build_student_config(name: str = "vit-tiny") -> ViTConfig:
+    if name not in STUDENT_CONFIGS:
+        raise ValueError(f"Unknown student config: {name} (choose from {list(STUDENT_CONFIGS)})")
+    return ViTConfig(image_size=224, patch_size=16, **STUDENT_CONFIGS[name])
 
 
 class ImageClassifier(nn.Module):
     def __init__(
         self, 
         model_name: str = "google/vit-base-patch16-224-in21k", 
-        num_classes: int = 2
+        num_classes: int = 2,
+        config: Optional[ViTConfig] = None
     ) -> None:
         super(ImageClassifier, self).__init__()
 
-        self.vit: ViTModel = ViTModel.from_pretrained(model_name)
+        # A local config builds a randomly initialised backbone without touching the Hub
+        if config is not None:
+            self.vit: ViTModel = ViTModel(config)
+        else:
+            self.vit: ViTModel = ViTModel.from_pretrained(model_name)
         self.embedding_dim: int = self.vit.config.hidden_size
 
         self.classifier: nn.Sequential = nn.Sequential(
@@ -24,7 +43,9 @@ class ImageClassifier(nn.Module):
         )
 
     def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
-        outputs = self.vit(pixel_values=pixel_values)
+        # Inputs at another resolution (e.g. a cascade's cheap first stage) need resized position embeddings
+        interpolate = pixel_values.shape[-1] != self.vit.config.image_size
+        outputs = self.vit(pixel_values=pixel_values, interpolate_pos_encoding=interpolate)
         cls_embedding = outputs.last_hidden_state[:, 0, :]  # [CLS] token
         logits: torch.Tensor = self.classifier(cls_embedding)
         return logits
@@ -9,6 +9,8 @@ import torch.nn as nn
 from transformers import AutoImageProcessor
 
 from src.utils import load_model
+from src.metrics import time_stage
+from src.cascade import CascadeClassifier, load_cascade
 
 
 def predict(
@@ -28,15 +30,18 @@ def predict(
         for img in images:
             if isinstance(img, str):
                 image_id = img
-                image = Image.open(img).convert("RGB")
+                with time_stage("decode"):
+                    image = Image.open(img).convert("RGB")
             else: 
                 image_id = "<PIL.Image>"
                 image = img.convert("RGB")
 
-            encoding = processor(images=[image], return_tensors="pt")
-            inputs = encoding["pixel_values"].to(device)
+            with time_stage("preprocess"):
+                encoding = processor(images=[image], return_tensors="pt")
+                inputs = encoding["pixel_values"].to(device)
 
-            logits = model(inputs)
+            with time_stage("forward"):
+                logits = model(inputs)
             probs = torch.softmax(logits, dim=-1)
             pred_class = torch.argmax(probs, dim=-1).item()
             pred_prob = probs[0, pred_class].item()
@@ -46,6 +51,38 @@ def predict(
     return predictions
 
 
+def predict_cascade(
+    cascade: CascadeClassifier,
+    images: List[Union[str, Image.Image]],
+    batch_size: int = 16
+) -> Tuple[List[Tuple[str, str, float]], List[str]]:
+    """Predict through the cascade; also returns which stage ("fast" or "full") answered each image."""
+    predictions, stages = [], []
+    class_map = {0: "cat", 1: "dog"}
+
+    for start in range(0, len(images), batch_size):
+        image_ids, batch = [], []
+        for img in images[start:start + batch_size]:
+            if isinstance(img, str):
+                image_ids.append(img)
+                with time_stage("decode"):
+                    batch.append(Image.open(img).convert("RGB"))
+            else:
+                image_ids.append("<PIL.Image>")
+                batch.append(img.convert("RGB"))
+
+        probs, escalated = cascade(batch)
+        pred_probs, pred_classes = probs.max(dim=-1)
+
+        for image_id, pred_class, pred_prob, was_escalated in zip(
+            image_ids, pred_classes.tolist(), pred_probs.tolist(), escalated.tolist()
+        ):
+            predictions.append((image_id, class_map[pred_class], pred_prob))
+            stages.append("full" if was_escalated else "fast")
+
+    return predictions, stages
+
+
 def save_predictions(predictions: List[Tuple[str, str, float]], output_path: str):
     """Save predictions to a CSV file, create folder if needed."""
     os.makedirs(os.path.dirname(output_path), exist_ok=True)  # tạo folder nếu chưa có
@@ -65,8 +102,14 @@ def parse_args():
     parser.add_argument("--checkpoint_path", type=str, required=True, help="Path to model checkpoint (.pt)")
     parser.add_argument("--num_classes", type=int, required=True, help="Number of classes in the model")
     parser.add_argument("--device", type=str, default=None, help="Device: cpu or cuda")
-    parser.add_argument("--images", type=str, nargs="+", required=True, help="List of image paths to predict")
-    parser.add_argument("--output_path", type=str, default="predictions.csv", help="Path to save predictions (CSV file)")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--images", type=str, nargs="+", help="List of image paths to predict")
+    inputs.add_argument("--input", type=str, help="Directory or archive (.zip/.tar/.tar.gz) for a streaming bulk job")
+    parser.add_argument("--output_path", type=str, default="predictions.csv", help="Path to save predictions (CSV file, or .ndjson for bulk jobs)")
+    parser.add_argument("--batch_size", type=int, default=32, help="Images decoded and predicted at a time in bulk jobs")
+    parser.add_argument("--checkpoint_every", type=int, default=1000, help="Bulk jobs checkpoint progress every N images")
+    parser.add_argument("--no_resume", action="store_true", help="Restart a bulk job instead of resuming from its checkpoint")
+    parser.add_argument("--cascade_config", type=str, default=None, help="Cascade config from src.calibrate (enables cascade inference)")
     return parser.parse_args()
 
 
@@ -83,11 +126,35 @@ if __name__ == "__main__":
         device=device,
     )
 
-    predictions = predict(
-        model=model,
-        processor=processor,
-        images=args.images,
-        device=device
-    )
-
-    save_predictions(predictions, args.output_path)
\ No newline at end of file
+    cascade = None
+    if args.cascade_config:
+        cascade = load_cascade(args.cascade_config, model, processor, device=device)
+
+    if args.input:
+        # Imported here because src.bulk builds on the predict functions above
+        from src.bulk import run_bulk_job
+
+        run_bulk_job(
+            source=args.input,
+            output_path=args.output_path,
+            model=model,
+            processor=processor,
+            batch_size=args.batch_size,
+            checkpoint_every=args.checkpoint_every,
+            resume=not args.no_resume,
+            device=device,
+            cascade=cascade
+        )
+    else:
+        if cascade is not None:
+            predictions, stages = predict_cascade(cascade, args.images)
+            print(f"⚡ {stages.count('fast')}/{len(stages)} images answered by the first stage")
+        else:
+            predictions = predict(
+                model=model,
+                processor=processor,
+                images=args.images,
+                device=device
+            )
+
+        save_predictions(predictions, args.output_path)
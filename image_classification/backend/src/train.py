@@ -6,10 +6,12 @@ import torch.nn as nn
 from torch.optim import Adam, Optimizer
 from torch.utils.data import DataLoader
 from tqdm import tqdm
+from transformers import AutoImageProcessor
 
 from src.dataset import load_dataloader
-from src.model import load_processor_and_model
-from src.utils import save_model, setup_logger
+from src.distill import DistillationLoss, load_or_compute_teacher_logits, report_distillation
+from src.model import ImageClassifier, build_student_config, load_processor_and_model, STUDENT_CONFIGS
+from src.utils import load_image_paths, load_model, save_model, setup_logger, split_train_test
 
 
 def eval_model(
@@ -59,12 +61,14 @@ def train_model(
         running_loss = 0.0
 
         pbar = tqdm(train_dataloader, desc=f"Epoch {epoch+1}/{num_epochs}", unit="batch")
-        for inputs, labels in pbar:
+        # Distillation batches carry teacher logits as extra criterion inputs
+        for inputs, labels, *extras in pbar:
             inputs, labels = inputs.to(device), labels.to(device)
+            extras = [extra.to(device) for extra in extras]
 
             optimizer.zero_grad()
             outputs = model(inputs)
-            loss = criterion(outputs, labels)
+            loss = criterion(outputs, labels, *extras)
             loss.backward()
             optimizer.step()
 
@@ -122,6 +126,13 @@ def parse_args():
     parser.add_argument("--log_file", type=str, default="training.log", help="Path to log file")
     parser.add_argument("--save_path", type=str, default="best_model.pth", help="Path to save the best model")
 
+    # Distillation mode (enabled by --teacher_checkpoint)
+    parser.add_argument("--teacher_checkpoint", type=str, default=None, help="Teacher checkpoint (.pth); trains a student by knowledge distillation")
+    parser.add_argument("--student_config", type=str, default="vit-tiny", choices=list(STUDENT_CONFIGS), help="Locally configured student architecture")
+    parser.add_argument("--teacher_logits_path", type=str, default="models/teacher_logits.pt", help="Cache of precomputed teacher logits")
+    parser.add_argument("--temperature", type=float, default=4.0, help="Distillation softmax temperature")
+    parser.add_argument("--alpha", type=float, default=0.7, help="Weight of the distillation term vs. label cross-entropy")
+
     return parser.parse_args()
 
 
@@ -130,13 +141,45 @@ if __name__ == "__main__":
     args = parse_args()
     device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    processor, model = load_processor_and_model(
-        model_name=args.model_name,
-        num_classes=args.num_classes
-    )
+    teacher = None
+    teacher_logits = None
+    student_config = None
+
+    if args.teacher_checkpoint:
+        teacher, _, _ = load_model(
+            checkpoint_path=args.teacher_checkpoint,
+            optimizer=None,
+            model_kwargs={"model_name": args.model_name, "num_classes": args.num_classes},
+            device=device
+        )
+        processor = AutoImageProcessor.from_pretrained(args.model_name)
+
+        # Teacher logits only depend on the images, so they are computed once for the training split
+        train_dict, _ = split_train_test(load_image_paths(args.root_dir), args.train_ratio, seed=42)
+        train_paths = [path for paths in train_dict.values() for path in paths]
+        teacher_logits = load_or_compute_teacher_logits(
+            cache_path=args.teacher_logits_path,
+            teacher_checkpoint=args.teacher_checkpoint,
+            model_name=args.model_name,
+            teacher=teacher,
+            processor=processor,
+            image_paths=train_paths,
+            batch_size=args.batch_size,
+            device=device
+        )
+        teacher.to("cpu")
+
+        student_config = build_student_config(args.student_config)
+        model = ImageClassifier(num_classes=args.num_classes, config=student_config)
+        criterion = DistillationLoss(temperature=args.temperature, alpha=args.alpha)
+    else:
+        processor, model = load_processor_and_model(
+            model_name=args.model_name,
+            num_classes=args.num_classes
+        )
+        criterion = nn.CrossEntropyLoss()
     
     optimizer = Adam(model.parameters(), lr=args.lr, weight_decay=args.weight_decay)
-    criterion = nn.CrossEntropyLoss()
 
     train_dataloader, val_dataloader = load_dataloader(
         root_dir=args.root_dir,
@@ -144,7 +187,8 @@ if __name__ == "__main__":
         batch_size=args.batch_size,
         train_ratio=args.train_ratio,
         seed=42,
-        num_workers=args.num_workers
+        num_workers=args.num_workers,
+        teacher_logits=teacher_logits
     )
 
     model, history = train_model(
@@ -163,5 +207,9 @@ if __name__ == "__main__":
         model=model,
         optimizer=None,
         history=history,
-        path=args.save_path
+        path=args.save_path,
+        model_config=student_config
     )
+
+    if teacher is not None:
+        report_distillation(teacher.to(device), model, val_dataloader, device)
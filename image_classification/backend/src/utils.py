@@ -8,6 +8,7 @@ from typing import Dict, List, Tuple, Optional
 import torch
 import torch.nn as nn
 from torch.optim import Optimizer
+from transformers import ViTConfig
 
 from src.model import ImageClassifier
 
@@ -85,7 +86,8 @@ def save_model(
     model: nn.Module,
     optimizer: Optional[Optimizer],
     history: Dict[str, List[float]],
-    path: str = "model_checkpoint.pth"
+    path: str = "model_checkpoint.pth",
+    model_config: Optional[ViTConfig] = None
 ) -> None:
     
     checkpoint = {
@@ -94,6 +96,9 @@ def save_model(
     }
     if optimizer is not None:
         checkpoint["optimizer_state_dict"] = optimizer.state_dict()
+    # Locally configured backbones (e.g. distilled students) cannot be rebuilt from a Hub name
+    if model_config is not None:
+        checkpoint["model_config"] = model_config.to_dict()
     
     torch.save(checkpoint, path)
     print(f"✅ Model saved successfully at {path}")
@@ -109,9 +114,11 @@ def load_model(
     if model_kwargs is None:
         model_kwargs = {}
 
-    model = ImageClassifier(**model_kwargs)
     checkpoint = torch.load(checkpoint_path, map_location=device)
+    if "model_config" in checkpoint and "config" not in model_kwargs:
+        model_kwargs = {**model_kwargs, "config": ViTConfig.from_dict(checkpoint["model_config"])}
 
+    model = ImageClassifier(**model_kwargs)
     model.load_state_dict(checkpoint["model_state_dict"])
     model.to(device)
     
@@ -0,0 +1,119 @@
+import os
+import csv
+import json
+import zipfile
+
+import pytest
+from PIL import Image
+
+import src.bulk as bulk
+from src.bulk import iter_archive, run_bulk_job
+
+
+class StubPredict:
+    """Stands in for src.predict.predict: answers "cat" and fails once `fail_after` images were seen."""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.seen = 0
+
+    def __call__(self, model, processor, images, device="cpu"):
+        if self.fail_after is not None and self.seen + len(images) > self.fail_after:
+            raise RuntimeError("interrupted")
+        self.seen += len(images)
+        return [("<PIL.Image>", "cat", 0.9) for _ in images]
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    root = tmp_path / "images"
+    root.mkdir()
+    for i in range(5):
+        Image.new("RGB", (8, 8), (i * 40, 0, 0)).save(root / f"{i}.png")
+    return str(root)
+
+
+def read_rows(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_resume_drops_rows_after_checkpoint_and_skips_done_items(image_dir, tmp_path, monkeypatch):
+    output_path = str(tmp_path / "out" / "predictions.csv")
+
+    monkeypatch.setattr(bulk, "predict", StubPredict(fail_after=3))
+    with pytest.raises(RuntimeError, match="interrupted"):
+        run_bulk_job(image_dir, output_path, model=None, processor=None, batch_size=1, checkpoint_every=2)
+
+    with open(output_path + ".checkpoint.json", "r", encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["processed"] == 2
+    assert not state["completed"]
+    # The third row was written after the checkpoint and must not survive the resume
+    assert len(read_rows(output_path)) == 1 + 3
+
+    resumed = StubPredict()
+    monkeypatch.setattr(bulk, "predict", resumed)
+    assert run_bulk_job(image_dir, output_path, model=None, processor=None, batch_size=1, checkpoint_every=2) == 5
+    assert resumed.seen == 3
+
+    rows = read_rows(output_path)
+    assert rows[0] == "image_id,predicted_label,confidence,stage,error"
+    assert [row.split(",")[0] for row in rows[1:]] == [os.path.join(image_dir, f"{i}.png") for i in range(5)]
+
+    with open(output_path + ".checkpoint.json", "r", encoding="utf-8") as f:
+        assert json.load(f)["completed"]
+
+
+def test_completed_job_is_not_rerun(image_dir, tmp_path, monkeypatch):
+    output_path = str(tmp_path / "predictions.ndjson")
+    monkeypatch.setattr(bulk, "predict", StubPredict())
+    run_bulk_job(image_dir, output_path, model=None, processor=None)
+
+    rerun = StubPredict()
+    monkeypatch.setattr(bulk, "predict", rerun)
+    assert run_bulk_job(image_dir, output_path, model=None, processor=None) == 5
+    assert rerun.seen == 0
+    assert len(read_rows(output_path)) == 5
+
+
+def test_no_resume_starts_over(image_dir, tmp_path, monkeypatch):
+    output_path = str(tmp_path / "predictions.csv")
+    monkeypatch.setattr(bulk, "predict", StubPredict())
+    run_bulk_job(image_dir, output_path, model=None, processor=None)
+    run_bulk_job(image_dir, output_path, model=None, processor=None, resume=False)
+    assert len(read_rows(output_path)) == 1 + 5
+
+
+def test_csv_rows_keep_the_error_message(tmp_path, monkeypatch):
+    root = tmp_path / "images"
+    root.mkdir()
+    Image.new("RGB", (8, 8)).save(root / "0.png")
+    (root / "1.png").write_bytes(b"not an image")
+    output_path = str(tmp_path / "predictions.csv")
+
+    monkeypatch.setattr(bulk, "predict", StubPredict())
+    run_bulk_job(str(root), output_path, model=None, processor=None)
+
+    with open(output_path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["predicted_label"] == "cat" and rows[0]["error"] == ""
+    assert rows[1]["predicted_label"] == "" and rows[1]["error"]
+
+
+def test_iter_archive_skips_members_without_reading_them(image_dir, tmp_path, monkeypatch):
+    archive_path = str(tmp_path / "images.zip")
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for i in range(5):
+            archive.write(os.path.join(image_dir, f"{i}.png"), f"{i}.png")
+
+    read_names = []
+    original_read = zipfile.ZipFile.read
+
+    def tracking_read(self, name, *args, **kwargs):
+        read_names.append(getattr(name, "filename", name))
+        return original_read(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "read", tracking_read)
+    assert [name for name, _ in iter_archive(archive_path, skip=3)] == ["3.png", "4.png"]
+    assert read_names == ["3.png", "4.png"]
@@ -1,14 +1,29 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 
-from src.correction import correction
+from src.correction import correction_with_stats, load_corrector
 from src.tts import text_to_wav
+from src.metrics import RequestTracker, render_metrics
+
+
+TRACKED_PATHS = {"/correction", "/tts"}
+TTS_OUTPUT_PATH = os.getenv("TTS_OUTPUT_PATH", "assets/output.wav")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the corrector at boot so the first request does not pay for it
+    load_corrector()
+    yield
 
 
 app = FastAPI(
     title="Vietnamese NLP API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -18,11 +33,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+app.add_middleware(RequestTracker, tracked_paths=TRACKED_PATHS)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/correction")
 async def correct_text(text: str):
     try:
-        corrected = correction(text)
-        return {"corrected": corrected}
+        corrected, stats = correction_with_stats(text)
+        return {"corrected": corrected, "stats": stats}
     except Exception as e:
         return JSONResponse(
             content={"error": str(e)},
@@ -33,8 +57,7 @@ async def correct_text(text: str):
 @app.post("/tts")
 async def tts_endpoint(text: str = Form(...)):
     try:
-        output_path = "assets/output.wav"
-        wav_file = text_to_wav(text, output_path)
+        wav_file = text_to_wav(text, TTS_OUTPUT_PATH)
         return FileResponse(
             wav_file,
             media_type="audio/wav",
@@ -1,20 +1,130 @@
+import os
+import time
 import argparse
+from typing import Dict, List, Tuple
+
 from transformers import pipeline
 
-corrector = pipeline("text2text-generation", model="bmd1905/vietnamese-correction")
+from src.correction_engine import CorrectionEngine
+from src.correction_cache import CorrectionCache, LexiconChecker, load_lexicon_words, segment_key, split_segments
+from src.metrics import CORRECTION_SAVED_SECONDS, CORRECTION_SEGMENTS, time_model_load, time_stage
+
+
+MODEL_NAME = "bmd1905/vietnamese-correction"
+MAX_CHARS = 256
+GENERATION_BATCH_SIZE = 8
+
+CACHE_SIZE = int(os.getenv("CORRECTION_CACHE_SIZE", "4096"))
+# Optional SQLite file for a cache tier that survives restarts
+CACHE_PATH = os.getenv("CORRECTION_CACHE_PATH") or None
+# Opt-in: a bypassed segment is returned as typed, so only enable it after checking the false-bypass rate
+BYPASS_ENABLED = os.getenv("CORRECTION_BYPASS", "0") == "1"
+# "pipeline" (fp32 transformers pipeline) or "engine" (CorrectionEngine: int8, length-adaptive greedy decoding)
+BACKEND = os.getenv("CORRECTION_BACKEND", "pipeline")
+QUANTIZE = os.getenv("CORRECTION_QUANTIZE", "1") == "1"
+# Engine generation budget: LENGTH_RATIO * input tokens + LENGTH_SLACK (see benchmarks.correction's length record)
+LENGTH_RATIO = float(os.getenv("CORRECTION_LENGTH_RATIO", "1.3"))
+LENGTH_SLACK = int(os.getenv("CORRECTION_LENGTH_SLACK", "8"))
+# Backends may word corrections differently, so they never share cache entries
+CACHE_NAMESPACE = f"{MODEL_NAME}|{BACKEND}" + ("-int8" if BACKEND == "engine" and QUANTIZE else "")
+
+corrector = None
+cache = CorrectionCache(max_entries=CACHE_SIZE, path=CACHE_PATH)
+already_correct = LexiconChecker(load_lexicon_words("./assets/lexicon.txt") if BYPASS_ENABLED else set())
+
+# Running estimate of generation cost, used to value bypassed segments
+_seconds_per_char = 0.0
+
+
+def load_corrector(model_name: str = MODEL_NAME):
+    global corrector
+    if corrector is None:
+        with time_model_load("corrector"):
+            if BACKEND == "engine":
+                corrector = CorrectionEngine.from_pretrained(
+                    model_name,
+                    quantize=QUANTIZE,
+                    max_length=MAX_CHARS,
+                    batch_size=GENERATION_BATCH_SIZE,
+                    length_ratio=LENGTH_RATIO,
+                    length_slack=LENGTH_SLACK
+                )
+            else:
+                corrector = pipeline("text2text-generation", model=model_name)
+    return corrector
+
+
+def _generate(segments: List[str]) -> List[Tuple[str, float]]:
+    """Correct segments in one batched call; each gets a share of the time proportional to its length."""
+    global _seconds_per_char
+    corrector = load_corrector()
+
+    start = time.perf_counter()
+    with time_stage("correction_generate"):
+        if isinstance(corrector, CorrectionEngine):
+            outputs = corrector(segments)
+        else:
+            preds = corrector(segments, max_length=MAX_CHARS, batch_size=min(len(segments), GENERATION_BATCH_SIZE))
+            # A list input yields one {"generated_text": ...} per segment
+            outputs = [pred["generated_text"] for pred in preds]
+    elapsed = time.perf_counter() - start
+
+    total_chars = sum(len(segment) for segment in segments)
+    rate = elapsed / total_chars if total_chars else 0.0
+    _seconds_per_char = rate if _seconds_per_char == 0.0 else 0.9 * _seconds_per_char + 0.1 * rate
+
+    return [(output, rate * len(segment)) for output, segment in zip(outputs, segments)]
+
+
+def correction_with_stats(text: str) -> Tuple[str, Dict[str, float]]:
+    """Correct `text` sentence by sentence, serving repeats from the cache and skipping already-correct ones.
+
+    Unlike one generate call per 256-char chunk, the text is NFC-normalised, spaces inside a sentence are
+    collapsed, and each sentence or line is corrected on its own; the whitespace between them is kept.
+    """
+    pairs = split_segments(text, MAX_CHARS)
+    segments = [segment for segment, _ in pairs]
+    corrected: List[str] = [""] * len(segments)
+    stats = {"segments": len(segments), "cache_hits": 0, "bypassed": 0, "generated": 0, "saved_seconds": 0.0}
+
+    misses: Dict[str, List[int]] = {}
+    for i, segment in enumerate(segments):
+        key = segment_key(segment, CACHE_NAMESPACE)
+        entry, tier = cache.get(key)
+        if entry is not None:
+            corrected[i] = entry[0]
+            stats["cache_hits"] += 1
+            stats["saved_seconds"] += entry[1]
+            CORRECTION_SEGMENTS.inc(f"{tier}_hit")
+            CORRECTION_SAVED_SECONDS.inc(f"{tier}_hit", amount=entry[1])
+        elif already_correct(segment):
+            corrected[i] = segment
+            saved = _seconds_per_char * len(segment)
+            stats["bypassed"] += 1
+            stats["saved_seconds"] += saved
+            CORRECTION_SEGMENTS.inc("bypass")
+            CORRECTION_SAVED_SECONDS.inc("bypass", amount=saved)
+        else:
+            # Repeats inside one request are generated once
+            misses.setdefault(segment, []).append(i)
+
+    if misses:
+        unique_segments = list(misses)
+        for segment, (output, seconds) in zip(unique_segments, _generate(unique_segments)):
+            cache.put(segment_key(segment, CACHE_NAMESPACE), output, seconds)
+            for i in misses[segment]:
+                corrected[i] = output
+        generated = sum(len(indices) for indices in misses.values())
+        stats["generated"] = generated
+        CORRECTION_SEGMENTS.inc("generated", amount=generated)
+
+    stats["saved_seconds"] = round(stats["saved_seconds"], 4)
+    return "".join(output + separator for output, (_, separator) in zip(corrected, pairs)), stats
 
 
 def correction(text: str) -> str:
-    if len(text) <= 256:
-        preds = corrector(text, max_length=256)
-        return preds[0]["generated_text"]
-    else:
-        chunks = [text[i:i+256] for i in range(0, len(text), 256)]
-        corrected_chunks = []
-        for chunk in chunks:
-            preds = corrector(chunk, max_length=256)
-            corrected_chunks.append(preds[0]["generated_text"])
-        return " ".join(corrected_chunks)
+    corrected, _ = correction_with_stats(text)
+    return corrected
 
 
 def parse_args():
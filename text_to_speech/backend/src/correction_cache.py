@@ -0,0 +1,127 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Set, Tuple
+
+
+# Captures the whitespace after a sentence end, or around a line break, so it can be put back
+SENTENCE_BREAK = re.compile(r"((?<=[.!?…])\s+|\s*\n\s*)")
+CLOSING_PUNCTUATION = (".", "!", "?", "…")
+WORD = re.compile(r"[^\W\d_]+")
+
+
+def normalize_segment(text: str) -> str:
+    # NFC so composed and decomposed diacritics share a cache entry
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def split_segments(text: str, max_chars: int = 256) -> List[Tuple[str, str]]:
+    """Split into (segment, separator) pairs: sentences and lines, cut at `max_chars` like the original chunking.
+
+    Each separator is the whitespace that followed the segment, so joining the pairs keeps line breaks.
+    """
+    parts = SENTENCE_BREAK.split(unicodedata.normalize("NFC", text).strip())
+    pairs: List[Tuple[str, str]] = []
+    for sentence, separator in zip(parts[0::2], parts[1::2] + [""]):
+        sentence = normalize_segment(sentence)
+        if not sentence:
+            continue
+        chunks = [sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)]
+        pairs.extend((chunk, " ") for chunk in chunks[:-1])
+        pairs.append((chunks[-1], separator))
+    return pairs
+
+
+def segment_key(segment: str, namespace: str) -> str:
+    return hashlib.sha1(f"{namespace}\n{segment}".encode("utf-8")).hexdigest()
+
+
+class CorrectionCache:
+    """Bounded in-memory LRU of corrected segments, optionally backed by a SQLite file that survives restarts."""
+
+    def __init__(self, max_entries: int = 4096, path: Optional[str] = None) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            cache_dir = os.path.dirname(path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS corrections (key TEXT PRIMARY KEY, corrected TEXT, seconds REAL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Tuple[Optional[Tuple[str, float]], str]:
+        """Return ((corrected, generation_seconds), tier) with tier "memory" or "disk", or (None, "miss")."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, "memory"
+
+            if self._db is not None:
+                row = self._db.execute("SELECT corrected, seconds FROM corrections WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, (row[0], row[1]))
+                    return (row[0], row[1]), "disk"
+
+        return None, "miss"
+
+    def put(self, key: str, corrected: str, seconds: float) -> None:
+        with self._lock:
+            self._remember(key, (corrected, seconds))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO corrections (key, corrected, seconds) VALUES (?, ?, ?)",
+                    (key, corrected, seconds)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, entry: Tuple[str, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def load_lexicon_words(path: str) -> Set[str]:
+    """Syllables of the vietTTS lexicon (one `word<TAB>phonemes` per line); empty if the file is missing."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {unicodedata.normalize("NFC", line.split("\t", 1)[0].strip().lower()) for line in f if "\t" in line}
+
+
+class LexiconChecker:
+    """Cheap already-correct test for segments the corrector would return unchanged.
+
+    The segment must start with a capital and end with closing punctuation (the corrector adds both), every
+    syllable must be in the lexicon, and nearly all of them must carry diacritics: unaccented syllables such
+    as "cai" or "ban" are valid on their own, so a low ratio lets partly unaccented text through.
+    """
+
+    def __init__(self, words: Set[str], min_diacritic_ratio: float = 0.8) -> None:
+        self.words = words
+        self.min_diacritic_ratio = min_diacritic_ratio
+
+    def __call__(self, segment: str) -> bool:
+        if not self.words or not segment[:1].isupper() or not segment.endswith(CLOSING_PUNCTUATION):
+            return False
+
+        syllables = WORD.findall(segment.lower())
+        if not syllables or any(s not in self.words for s in syllables):
+            return False
+
+        with_diacritics = sum(1 for s in syllables if not s.isascii())
+        return with_diacritics / len(syllables) >= self.min_diacritic_ratio
@@ -0,0 +1,256 @@
+import time
+import bisect
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+DEFAULT_QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _HistogramSeries:
+
+    def __init__(self, buckets: Sequence[float], window: int):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.total: float = 0.0
+        self.count: int = 0
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[idx] += 1
+            self.total += value
+            self.count += 1
+            self.recent.append(value)
+
+    def quantiles(self, qs: Sequence[float]) -> Dict[float, float]:
+        with self.lock:
+            values = sorted(self.recent)
+        if not values:
+            return {q: float("nan") for q in qs}
+        last = len(values) - 1
+        return {q: values[min(last, int(round(q * last)))] for q in qs}
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self.lock:
+            return list(self.counts), self.total, self.count
+
+
+class Histogram:
+    """Cumulative Prometheus histogram plus p50/p95/p99 over a sliding window of recent samples."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        window: int = 1024
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.quantiles = tuple(quantiles)
+        self.window = window
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *labelvalues: str) -> _HistogramSeries:
+        series = self._series.get(labelvalues)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labelvalues, _HistogramSeries(self.buckets, self.window))
+        return series
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        self.labels(*labelvalues).observe(value)
+
+    def collect(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        quantile_lines = [
+            f"# HELP {self.name}_quantile Quantiles of {self.name} over the last {self.window} samples",
+            f"# TYPE {self.name}_quantile gauge",
+        ]
+        for labelvalues, series in sorted(self._series.items()):
+            counts, total, count = series.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+
+            for q, value in series.quantiles(self.quantiles).items():
+                labels = _format_labels(self.labelnames, labelvalues, f'quantile="{q}"')
+                quantile_lines.append(f"{self.name}_quantile{labels} {_format_value(value)}")
+
+        return lines + quantile_lines
+
+
+class Counter:
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+
+    metric_type = "gauge"
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Latency of individual pipeline stages",
+    labelnames=("stage",)
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "End-to-end HTTP request latency",
+    labelnames=("method", "path", "status")
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Number of HTTP requests currently being served",
+    labelnames=("path",)
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "model_load_seconds",
+    "Wall-clock time spent loading each model",
+    labelnames=("model",)
+)
+CORRECTION_SEGMENTS = Counter(
+    "correction_segments_total",
+    "Correction segments by outcome (memory_hit, disk_hit, bypass, generated)",
+    labelnames=("outcome",)
+)
+CORRECTION_SAVED_SECONDS = Counter(
+    "correction_saved_seconds_total",
+    "Estimated generation time avoided by the correction cache and bypass",
+    labelnames=("outcome",)
+)
+
+REGISTRY = [
+    STAGE_SECONDS, REQUEST_SECONDS, IN_FLIGHT, MODEL_LOAD_SECONDS, CORRECTION_SEGMENTS, CORRECTION_SAVED_SECONDS
+]
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    series = STAGE_SECONDS.labels(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        series.observe(time.perf_counter() - start)
+
+
+@contextmanager
+def time_model_load(model: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model)
+
+
+@contextmanager
+def track_request(method: str, path: str) -> Iterator[Dict[str, Optional[int]]]:
+    """Count the request as in flight and record its latency with the status stored in the yielded dict."""
+    state: Dict[str, Optional[int]] = {"status": None}
+    IN_FLIGHT.inc(path)
+    start = time.perf_counter()
+    try:
+        yield state
+    finally:
+        IN_FLIGHT.dec(path)
+        status = str(state["status"] or 500)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, method, path, status)
+
+
+class RequestTracker:
+    """Plain ASGI middleware, so latency and in-flight counts cover the whole body of streamed and file responses."""
+
+    def __init__(self, app, tracked_paths: Set[str]) -> None:
+        self.app = app
+        self.tracked_paths = tracked_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # Unknown paths share one label so scanners cannot blow up the series count
+        path = scope["path"] if scope["path"] in self.tracked_paths else "other"
+        with track_request(scope["method"], path) as state:
+
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    state["status"] = message["status"]
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
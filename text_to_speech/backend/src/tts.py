@@ -7,6 +7,8 @@ from vietTTS import nat_normalize_text
 from vietTTS.hifigan.mel2wave import mel2wave
 from vietTTS.nat.text2mel import text2mel
 
+from src.metrics import time_stage
+
 
 def load_lexicon_utf8(fn):
     with open(fn, "r", encoding="utf-8") as f:   # ép UTF-8
@@ -17,15 +19,18 @@ def load_lexicon_utf8(fn):
 
 def text_to_speech(text):
     t2m.load_lexicon = load_lexicon_utf8
-    text = nat_normalize_text(text)
-    mel = text2mel(
-        text,
-        "./assets/lexicon.txt",
-        0.2,
-        "./assets/acoustic_ckpt.pickle",
-        "./assets/duration_ckpt.pickle",
-    )
-    wave = mel2wave(mel, "./assets/config.json", "./assets/hk_hifi.pickle")
+    with time_stage("normalize"):
+        text = nat_normalize_text(text)
+    with time_stage("text2mel"):
+        mel = text2mel(
+            text,
+            "./assets/lexicon.txt",
+            0.2,
+            "./assets/acoustic_ckpt.pickle",
+            "./assets/duration_ckpt.pickle",
+        )
+    with time_stage("hifigan"):
+        wave = mel2wave(mel, "./assets/config.json", "./assets/hk_hifi.pickle")
     return (wave * (2**15)).astype(np.int16)
 
 
@@ -37,7 +42,8 @@ def text_to_wav(text, wav_path="output.wav", batch_size=500):
         wave_int16 = text_to_speech(batch)
         all_wave = np.concatenate((all_wave, wave_int16))
     
-    write_wav(wav_path, 16000, all_wave)
+    with time_stage("wav_write"):
+        write_wav(wav_path, 16000, all_wave)
     print(f"WAV file created: {wav_path}")
     return wav_path
 